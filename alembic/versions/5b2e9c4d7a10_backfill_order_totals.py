@@ -0,0 +1,38 @@
+"""backfill order totals
+
+Revision ID: 5b2e9c4d7a10
+Revises: 16070f89241d
+Create Date: 2026-10-18 10:12:41.204512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e9c4d7a10"
+down_revision: Union[str, None] = "16070f89241d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        UPDATE orders
+        SET price = (
+            SELECT COALESCE(SUM(opa.count * opa.unit_price), 0)
+            FROM order_product_association AS opa
+            WHERE opa.order_id = orders.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
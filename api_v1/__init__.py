@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
 from .products.views import router as products_router
+from .orders.views import router as orders_router
 from .demo_auth.views import router as demo_auth_router
+from .analytics.views import router as analytics_router
 
 router = APIRouter()
 router.include_router(router=products_router, prefix="/products")
+router.include_router(router=orders_router, prefix="/orders")
 router.include_router(router=demo_auth_router)
+router.include_router(router=analytics_router)
@@ -0,0 +1,197 @@
+"""
+Sales aggregations, computed in SQL.
+
+Closed days are read from the daily_product_sales summary table,
+days after its watermark are aggregated live from the order lines.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select, insert, func, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Subquery
+
+from core.models import (
+    DailyProductSales,
+    Order,
+    OrderProductAssociation,
+    Product,
+    SummaryWatermark,
+)
+
+from .schemas import Bucket, RevenueBucket, TopProduct, RefreshResult
+
+DAILY_PRODUCT_SALES = "daily_product_sales"
+
+BUCKET_FORMATS = {
+    Bucket.day: "%Y-%m-%d",
+    Bucket.week: "%Y-W%W",
+    Bucket.month: "%Y-%m",
+}
+
+
+def start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def live_daily_sales(date_from: date, date_to: date):
+    day = func.date(Order.created_at)
+    return (
+        select(
+            day.label("day"),
+            OrderProductAssociation.product_id.label("product_id"),
+            func.sum(OrderProductAssociation.count).label("units"),
+            func.sum(
+                OrderProductAssociation.count * OrderProductAssociation.unit_price
+            ).label("revenue"),
+        )
+        .join(Order, Order.id == OrderProductAssociation.order_id)
+        .where(
+            Order.created_at >= start_of(date_from),
+            Order.created_at < start_of(date_to + timedelta(days=1)),
+        )
+        .group_by(day, OrderProductAssociation.product_id)
+    )
+
+
+async def get_watermark(session: AsyncSession) -> date | None:
+    return await session.scalar(
+        select(SummaryWatermark.through).where(
+            SummaryWatermark.name == DAILY_PRODUCT_SALES,
+        )
+    )
+
+
+async def daily_sales(
+    session: AsyncSession,
+    date_from: date,
+    date_to: date,
+) -> Subquery:
+    # expects date_from <= date_to
+    through = await get_watermark(session)
+    parts = []
+    if through is not None and date_from <= through:
+        parts.append(
+            select(
+                func.date(DailyProductSales.day).label("day"),
+                DailyProductSales.product_id,
+                DailyProductSales.units,
+                DailyProductSales.revenue,
+            ).where(
+                DailyProductSales.day >= date_from,
+                DailyProductSales.day <= min(date_to, through),
+            )
+        )
+    live_from = (
+        date_from if through is None else max(date_from, through + timedelta(days=1))
+    )
+    if live_from <= date_to:
+        parts.append(live_daily_sales(live_from, date_to))
+    return union_all(*parts).subquery("daily_sales")
+
+
+async def get_revenue(
+    session: AsyncSession,
+    date_from: date,
+    date_to: date,
+    bucket: Bucket,
+) -> list[RevenueBucket]:
+    sales = await daily_sales(session, date_from, date_to)
+    bucket_column = func.strftime(BUCKET_FORMATS[bucket], sales.c.day)
+    statement = (
+        select(
+            bucket_column.label("bucket"),
+            func.sum(sales.c.units).label("units"),
+            func.sum(sales.c.revenue).label("revenue"),
+        )
+        .group_by(bucket_column)
+        .order_by(bucket_column)
+    )
+    result = await session.execute(statement)
+    return [RevenueBucket.model_validate(row._asdict()) for row in result]
+
+
+async def get_top_products(
+    session: AsyncSession,
+    date_from: date,
+    date_to: date,
+    limit: int,
+) -> list[TopProduct]:
+    sales = await daily_sales(session, date_from, date_to)
+    revenue = func.sum(sales.c.revenue)
+    statement = (
+        select(
+            sales.c.product_id,
+            Product.name,
+            func.sum(sales.c.units).label("units"),
+            revenue.label("revenue"),
+        )
+        .join(Product, Product.id == sales.c.product_id)
+        .group_by(sales.c.product_id, Product.name)
+        .order_by(revenue.desc(), sales.c.product_id)
+        .limit(limit)
+    )
+    result = await session.execute(statement)
+    return [TopProduct.model_validate(row._asdict()) for row in result]
+
+
+async def refreshed_concurrently(session: AsyncSession) -> RefreshResult:
+    await session.rollback()
+    return RefreshResult(refreshed_through=await get_watermark(session), rows=0)
+
+
+async def refresh_daily_sales(
+    session: AsyncSession,
+    today: date,
+) -> RefreshResult:
+    """
+    Materialize every closed day after the watermark, i.e. up to yesterday.
+
+    The watermark is advanced first, with a compare-and-set: of two
+    concurrent refreshes only one inserts the days, the other returns
+    the watermark it moved to.
+    """
+    watermark = await session.scalar(
+        select(SummaryWatermark).where(
+            SummaryWatermark.name == DAILY_PRODUCT_SALES,
+        )
+    )
+    through = today - timedelta(days=1)
+    if watermark is not None and watermark.through >= through:
+        return RefreshResult(refreshed_through=watermark.through, rows=0)
+
+    if watermark is None:
+        first_order_at = await session.scalar(select(func.min(Order.created_at)))
+        if first_order_at is None:
+            return RefreshResult(refreshed_through=None, rows=0)
+        date_from = first_order_at.date()
+        session.add(SummaryWatermark(name=DAILY_PRODUCT_SALES, through=through))
+        try:
+            # the name is unique, a concurrent first refresh fails here
+            await session.flush()
+        except IntegrityError:
+            return await refreshed_concurrently(session)
+    else:
+        date_from = watermark.through + timedelta(days=1)
+        advanced = await session.execute(
+            update(SummaryWatermark)
+            .where(
+                SummaryWatermark.name == DAILY_PRODUCT_SALES,
+                SummaryWatermark.through == watermark.through,
+            )
+            .values(through=through)
+            .execution_options(synchronize_session=False)
+        )
+        if advanced.rowcount == 0:
+            return await refreshed_concurrently(session)
+
+    live = live_daily_sales(date_from, through)
+    result = await session.execute(
+        insert(DailyProductSales).from_select(
+            ["day", "product_id", "units", "revenue"],
+            live,
+        )
+    )
+    await session.commit()
+    return RefreshResult(refreshed_through=through, rows=result.rowcount)
@@ -0,0 +1,28 @@
+from datetime import date
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class Bucket(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class RevenueBucket(BaseModel):
+    bucket: str
+    units: int
+    revenue: int
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    name: str
+    units: int
+    revenue: int
+
+
+class RefreshResult(BaseModel):
+    refreshed_through: date | None
+    rows: int
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import db_helper
+from . import crud
+from .schemas import Bucket, RevenueBucket, TopProduct, RefreshResult
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+class DateRange:
+    def __init__(
+        self,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ):
+        self.date_to = date_to or date.today()
+        self.date_from = date_from or self.date_to - timedelta(days=30)
+        if self.date_from > self.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="date_from must not be after date_to",
+            )
+
+
+@router.get("/revenue/", response_model=list[RevenueBucket])
+async def get_revenue(
+    dates: DateRange = Depends(),
+    bucket: Bucket = Bucket.day,
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+):
+    return await crud.get_revenue(
+        session=session,
+        date_from=dates.date_from,
+        date_to=dates.date_to,
+        bucket=bucket,
+    )
+
+
+@router.get("/top-products/", response_model=list[TopProduct])
+async def get_top_products(
+    dates: DateRange = Depends(),
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+):
+    return await crud.get_top_products(
+        session=session,
+        date_from=dates.date_from,
+        date_to=dates.date_to,
+        limit=limit,
+    )
+
+
+@router.post("/refresh/", response_model=RefreshResult)
+async def refresh_summaries(
+    session: AsyncSession = Depends(
+        db_helper.session_dependency,
+    ),
+):
+    return await crud.refresh_daily_sales(session=session, today=date.today())
@@ -0,0 +1,55 @@
+import re
+
+from fastapi import HTTPException, Response, status
+
+ENTITY_TAG = re.compile(r'^"(\d+)-(\d+)"$')
+
+
+def make_etag(*parts: int | str) -> str:
+    return '"{}"'.format("-".join(str(part) for part in parts))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match compares weakly: W/"1" matches "1"
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag},
+    )
+
+
+def if_match_versions(if_match: str | None, resource_id: int) -> list[int] | None:
+    """
+    Versions the client last saw, from `If-Match: "<id>-<version>"`.
+
+    None means `*`, any version. If-Match compares strongly,
+    weak tags never match.
+    """
+    if if_match is None:
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="If-Match header required",
+        )
+    if if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        match = ENTITY_TAG.match(candidate.strip())
+        if match and int(match[1]) == resource_id:
+            versions.append(int(match[2]))
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not match this resource",
+        )
+    return versions
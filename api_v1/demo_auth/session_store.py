@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+from core.config import SessionSettings
+
+log = logging.getLogger("sessions")
+
+
+class SessionStore(ABC):
+    """
+    Server-side session storage with sliding expiry.
+
+    Every successful `get` pushes the expiry `ttl` seconds into the future.
+    Methods are sync, the demo_auth views run in the threadpool.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.clock = clock
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def set(self, session_id: str, data: dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None: ...
+
+    @abstractmethod
+    def purge_expired(self) -> int: ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process store, bounded to `max_sessions` by evicting the least recently used."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_sessions: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(ttl=ttl, clock=clock)
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        now = self.clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= now:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (now + self.ttl, data)
+            self._sessions.move_to_end(session_id)
+            return data
+
+    def set(self, session_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[session_id] = (self.clock() + self.ttl, data)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def purge_expired(self) -> int:
+        now = self.clock()
+        with self._lock:
+            expired = [
+                session_id
+                for session_id, (expires_at, _) in self._sessions.items()
+                if expires_at <= now
+            ]
+            for session_id in expired:
+                del self._sessions[session_id]
+        return len(expired)
+
+
+class SqliteSessionStore(SessionStore):
+    """Store in a SQLite file in WAL mode, shared by all workers on the host."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl: float,
+        max_sessions: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(ttl=ttl, clock=clock)
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=5.0,
+        )
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+            """
+        )
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        now = self.clock()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, expires_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            # only write back once half the ttl is used up,
+            # so most reads stay read-only
+            if row[1] - now < self.ttl / 2:
+                self._connection.execute(
+                    "UPDATE sessions SET expires_at = ? WHERE session_id = ?",
+                    (now + self.ttl, session_id),
+                )
+        return json.loads(row[0])
+
+    def set(self, session_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) "
+                "VALUES (?, ?, ?)",
+                (session_id, json.dumps(data), self.clock() + self.ttl),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM sessions WHERE session_id = ?",
+                (session_id,),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            purged = self._connection.execute(
+                "DELETE FROM sessions WHERE expires_at <= ?",
+                (self.clock(),),
+            ).rowcount
+            # keep the table bounded like the in-memory store,
+            # dropping the sessions closest to expiry
+            purged += self._connection.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY expires_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            ).rowcount
+        return purged
+
+
+def make_session_store(config: SessionSettings) -> SessionStore:
+    if config.backend == "sqlite":
+        return SqliteSessionStore(
+            path=config.sqlite_path,
+            ttl=config.ttl,
+            max_sessions=config.max_sessions,
+        )
+    return InMemorySessionStore(ttl=config.ttl, max_sessions=config.max_sessions)
+
+
+async def purge_sessions_periodically(store: SessionStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(store.purge_expired)
+        except Exception:
+            # e.g. a locked SQLite store, the next round tries again
+            log.exception("session purge failed")
@@ -1,11 +1,16 @@
-import secrets
 import uuid
 from time import time
-from typing import Annotated, Any
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Response, Cookie
 from fastapi.security import HTTPBasicCredentials, HTTPBasic
 
+from auth.credentials import CredentialStore, make_hash_executor
+from auth.passwords import ScryptParams
+from auth.tokens import RevocationList, TokenError, TokenSigner
+from core.config import settings
+from .session_store import make_session_store
+
 router = APIRouter(prefix="/demo-auth", tags=["demo-auth"])
 
 security = HTTPBasic()
@@ -27,6 +32,22 @@ usernames_to_passwords = {
     "john": "eggs",
 }
 
+credential_store = CredentialStore(
+    executor=make_hash_executor(
+        kind=settings.credentials.hash_executor,
+        workers=settings.credentials.hash_workers,
+    ),
+    params=ScryptParams(
+        n=settings.credentials.scrypt_n,
+        r=settings.credentials.scrypt_r,
+        p=settings.credentials.scrypt_p,
+    ),
+    cache_ttl=settings.credentials.verify_cache_ttl,
+    cache_max_size=settings.credentials.verify_cache_max_size,
+)
+for username, password in usernames_to_passwords.items():
+    credential_store.set_password(username, password)
+
 
 static_auth_token_to_username = {
     "f89e14d25f30b24a70ad4c0cb745": "admin",
@@ -34,31 +55,48 @@ static_auth_token_to_username = {
 }
 
 
-def get_auth_user_username(
+async def get_auth_user_username(
     credentials: Annotated[HTTPBasicCredentials, Depends(security)],
 ):
-    unauthed_exc = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid username or password",
-        headers={"WWW-Authenticate": "Basic"},
-    )
-    correct_password = usernames_to_passwords.get(credentials.username)
-    if correct_password is None:
-        raise unauthed_exc
-
-    # secrets
-    if not secrets.compare_digest(
-        credentials.password.encode("utf-8"),
-        correct_password.encode("utf-8"),
+    if not await credential_store.verify(
+        username=credentials.username,
+        password=credentials.password,
     ):
-        raise unauthed_exc
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid username or password",
+            headers={"WWW-Authenticate": "Basic"},
+        )
 
     return credentials.username
 
 
+token_signer = TokenSigner(
+    keys=settings.tokens.signing_keys,
+    active_key_id=settings.tokens.active_key_id,
+    ttl=settings.tokens.ttl,
+    revoked=RevocationList(max_size=settings.tokens.revocation_max_size),
+)
+
+
+def get_auth_token_payload(
+    token: str = Header(alias="x-auth-token"),
+) -> dict:
+    try:
+        return token_signer.decode(token)
+    except TokenError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Token invalid: {exc}",
+        )
+
+
 def get_username_by_static_auth_token(
     static_token: str = Header(alias="x-auth-token"),
 ) -> str:
+    # signed tokens are verified locally, the static table is the fallback
+    if static_token.count(".") == 2:
+        return get_auth_token_payload(static_token)["sub"]
     if token := static_auth_token_to_username.get(static_token):
         return token
     raise HTTPException(
@@ -75,6 +113,22 @@ def demo_basic_auth_username(auth_username: str = Depends(get_auth_user_username
     }
 
 
+@router.post("/tokens/")
+def demo_auth_issue_token(auth_username: str = Depends(get_auth_user_username)):
+    return {
+        "access_token": token_signer.issue(subject=auth_username),
+        "token_type": "bearer",
+        "expires_in": int(token_signer.ttl),
+    }
+
+
+@router.post("/tokens/revoke/", status_code=status.HTTP_204_NO_CONTENT)
+def demo_auth_revoke_token(
+    payload: dict = Depends(get_auth_token_payload),
+) -> None:
+    token_signer.revoke(payload)
+
+
 @router.get("/some-http-header-auth/")
 def demo_auth_some_http_header(
     username: str = Depends(get_username_by_static_auth_token),
@@ -85,7 +139,7 @@ def demo_auth_some_http_header(
     }
 
 
-COOKIES: dict[str, dict[str, Any]] = {}
+session_store = make_session_store(settings.sessions)
 COOKIE_SESSION_ID_KEY = "web-app-session-id"
 
 
@@ -96,13 +150,14 @@ def generate_session_id() -> str:
 def get_session_data(
     session_id: str = Cookie(alias=COOKIE_SESSION_ID_KEY),
 ) -> dict:
-    if session_id not in COOKIES:
+    session_data = session_store.get(session_id)
+    if session_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
 
-    return COOKIES[session_id]
+    return session_data
 
 
 @router.post("/login-cookie/")
@@ -112,10 +167,13 @@ def demo_auth_login_cookie(
     username: str = Depends(get_username_by_static_auth_token),
 ):
     session_id = generate_session_id()
-    COOKIES[session_id] = {
-        "username": username,
-        "login_at": int(time()),
-    }
+    session_store.set(
+        session_id,
+        {
+            "username": username,
+            "login_at": int(time()),
+        },
+    )
     response.set_cookie(COOKIE_SESSION_ID_KEY, session_id)
     return {
         "result": "ok",
@@ -139,7 +197,7 @@ def demo_auth_logout_cookie(
     session_id: str = Cookie(alias=COOKIE_SESSION_ID_KEY),
     user_session_data: dict = Depends(get_session_data),
 ):
-    COOKIES.pop(session_id)
+    session_store.delete(session_id)
     response.delete_cookie(COOKIE_SESSION_ID_KEY)
     username = user_session_data["username"]
     return {
@@ -0,0 +1,143 @@
+"""
+Create
+Read
+Update
+Delete
+"""
+
+from sqlalchemy import select, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.sql import Select
+
+from core.models import Order, OrderProductAssociation, Product
+from core.outbox import add_event
+
+from .schemas import OrderCreate, OrderSummary
+
+
+class ProductsNotFound(Exception):
+    def __init__(self, product_ids: list[int]):
+        self.product_ids = product_ids
+        super().__init__(f"Products not found: {product_ids}")
+
+
+def select_orders_with_lines() -> Select:
+    # one query for orders, one for all their lines joined to products,
+    # regardless of how many lines an order has
+    return select(Order).options(
+        selectinload(Order.products_details).joinedload(
+            OrderProductAssociation.product
+        ),
+    )
+
+
+async def get_orders(
+    session: AsyncSession,
+    limit: int,
+    after: int | None = None,
+) -> list[Order]:
+    statement = select_orders_with_lines().order_by(Order.id).limit(limit)
+    if after is not None:
+        statement = statement.where(Order.id > after)
+    orders = await session.scalars(statement)
+    return list(orders)
+
+
+async def get_order(session: AsyncSession, order_id: int) -> Order | None:
+    statement = select_orders_with_lines().where(Order.id == order_id)
+    return await session.scalar(statement)
+
+
+async def create_order(session: AsyncSession, order_in: OrderCreate) -> Order:
+    # merge repeated products, (order_id, product_id) is unique
+    counts: dict[int, int] = {}
+    for line in order_in.products:
+        counts[line.product_id] = counts.get(line.product_id, 0) + line.count
+
+    products = await session.scalars(
+        select(Product).where(Product.id.in_(counts)),
+    )
+    products_by_id = {product.id: product for product in products}
+    if missing := [
+        product_id for product_id in counts if product_id not in products_by_id
+    ]:
+        raise ProductsNotFound(missing)
+
+    order = Order(
+        promocode=order_in.promocode,
+        price=sum(
+            count * products_by_id[product_id].price
+            for product_id, count in counts.items()
+        ),
+    )
+    session.add(order)
+    await session.flush()
+    # a single executemany for all lines; Core inserts skip the ORM
+    # order total events, so the total is set on the order above
+    await session.execute(
+        insert(OrderProductAssociation),
+        [
+            {
+                "order_id": order.id,
+                "product_id": product_id,
+                "count": count,
+                "unit_price": products_by_id[product_id].price,
+            }
+            for product_id, count in counts.items()
+        ],
+    )
+    add_event(
+        session,
+        "order.created",
+        "order",
+        order.id,
+        {
+            "id": order.id,
+            "promocode": order.promocode,
+            "created_at": order.created_at.isoformat(),
+            "price": order.price,
+            "products": [
+                {
+                    "product_id": product_id,
+                    "count": count,
+                    "unit_price": products_by_id[product_id].price,
+                }
+                for product_id, count in counts.items()
+            ],
+        },
+    )
+    await session.commit()
+    return await session.scalar(
+        select_orders_with_lines()
+        .where(Order.id == order.id)
+        .execution_options(populate_existing=True),
+    )
+
+
+async def get_order_summary(
+    session: AsyncSession,
+    order_id: int,
+) -> OrderSummary | None:
+    # the total is precomputed on the order,
+    # line and item counts come from the (order_id, product_id) index
+    statement = (
+        select(
+            Order.id,
+            func.coalesce(Order.price, 0).label("total"),
+            func.count(OrderProductAssociation.id).label("line_count"),
+            func.coalesce(func.sum(OrderProductAssociation.count), 0).label(
+                "item_count"
+            ),
+        )
+        .outerjoin(
+            OrderProductAssociation,
+            OrderProductAssociation.order_id == Order.id,
+        )
+        .where(Order.id == order_id)
+        .group_by(Order.id)
+    )
+    row = (await session.execute(statement)).one_or_none()
+    if row is None:
+        return None
+    return OrderSummary.model_validate(row._asdict())
@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import Path, Query, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.models import db_helper, Order
+
+from . import crud
+
+
+async def order_by_id(
+    order_id: Annotated[int, Path],
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+) -> Order:
+    order = await crud.get_order(session=session, order_id=order_id)
+    if order is not None:
+        return order
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail=f"Order {order_id} not found"
+    )
+
+
+PageLimit = Annotated[
+    int,
+    Query(ge=1, le=settings.orders.max_page_size),
+]
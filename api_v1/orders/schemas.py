@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class OrderLineCreate(BaseModel):
+    product_id: int
+    count: Annotated[int, Field(ge=1)] = 1
+
+
+class OrderCreate(BaseModel):
+    promocode: str | None = None
+    products: Annotated[list[OrderLineCreate], Field(min_length=1)]
+
+
+class OrderLineProduct(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+    price: int
+
+
+class OrderLine(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    product_id: int
+    count: int
+    unit_price: int
+    product: OrderLineProduct
+
+
+class Order(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    promocode: str | None
+    created_at: datetime
+    price: int
+    products_details: list[OrderLine]
+
+
+class OrdersPage(BaseModel):
+    items: list[Order]
+    next_cursor: str | None = None
+
+
+class OrderSummary(BaseModel):
+    id: int
+    total: int
+    line_count: int
+    item_count: int
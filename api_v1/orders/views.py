@@ -0,0 +1,70 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.models import db_helper
+from ..pagination import after_cursor, encode_cursor
+from . import crud
+from .dependencies import order_by_id, PageLimit
+from .schemas import Order, OrderCreate, OrdersPage, OrderSummary
+
+router = APIRouter(tags=["orders"])
+
+
+@router.get("/", response_model=OrdersPage)
+async def get_orders(
+    limit: PageLimit = settings.orders.page_size,
+    after: int | None = Depends(after_cursor),
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+):
+    orders = await crud.get_orders(session=session, limit=limit + 1, after=after)
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].id)
+    return OrdersPage(items=orders, next_cursor=next_cursor)
+
+
+@router.post(
+    "/",
+    response_model=Order,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_order(
+    order_in: OrderCreate,
+    session: AsyncSession = Depends(
+        db_helper.session_dependency,
+    ),
+):
+    try:
+        return await crud.create_order(session=session, order_in=order_in)
+    except crud.ProductsNotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        )
+
+
+@router.get("/{order_id}/", response_model=Order)
+async def get_order(order: Order = Depends(order_by_id)) -> Order:
+    return order
+
+
+@router.get("/{order_id}/summary/", response_model=OrderSummary)
+async def get_order_summary(
+    order_id: Annotated[int, Path],
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+):
+    summary = await crud.get_order_summary(session=session, order_id=order_id)
+    if summary is not None:
+        return summary
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail=f"Order {order_id} not found"
+    )
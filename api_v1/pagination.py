@@ -0,0 +1,31 @@
+import base64
+import binascii
+
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+
+
+def encode_cursor(value: int) -> str:
+    raw = str(value).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        value = int(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeEncodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return value
+
+
+def after_cursor(
+    after: Annotated[str | None, Query()] = None,
+) -> int | None:
+    if after is None:
+        return None
+    return decode_cursor(after)
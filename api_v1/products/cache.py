@@ -0,0 +1,41 @@
+from core.cache import (
+    CacheBackend,
+    InMemoryCacheBackend,
+    LRUCache,
+    ReadThroughCache,
+    register_cache_metrics,
+)
+from core.config import settings
+from core.singleflight import SingleFlight
+
+from .schemas import Product
+
+
+def make_shared_backend(name: str) -> CacheBackend | None:
+    if name == "memory":
+        return InMemoryCacheBackend()
+    return None
+
+
+product_cache: ReadThroughCache[Product] = ReadThroughCache(
+    namespace="product",
+    local=LRUCache(
+        max_size=settings.products.cache.max_size,
+        ttl=settings.products.cache.ttl,
+    ),
+    shared=make_shared_backend(settings.products.cache.shared_backend),
+    dumps=lambda product: product.model_dump_json().encode("utf-8"),
+    loads=Product.model_validate_json,
+)
+register_cache_metrics(product_cache)
+
+# concurrent misses for one product share a single query
+product_lookups: SingleFlight[Product | None] = SingleFlight("product")
+# keyed by products table version, so a write starts fresh pages
+product_pages: SingleFlight = SingleFlight("products_page")
+
+
+async def invalidate_product(product_id: int) -> None:
+    # a lookup still in flight may have read the row before the write
+    product_lookups.forget(product_id)
+    await product_cache.invalidate(product_id)
@@ -5,21 +5,163 @@ Update
 Delete
 """
 
-from sqlalchemy import select
-from sqlalchemy.engine import Result
+import re
+from typing import Any, AsyncIterator, Sequence, TypeVar
+
+from sqlalchemy import Select, select, insert, update, delete
+from sqlalchemy.engine import Result, Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.models import Product
+from core.models import Product, TableVersion, products_fts
+from core.outbox import add_event, add_events
+
+from .cache import invalidate_product
+from .price_feed import publish_product_update
+from .schemas import (
+    PRODUCT_FIELDS,
+    ProductCreate,
+    ProductUpdate,
+    ProductUpdatePartial,
+    ProductBulkUpdate,
+    BulkItemError,
+)
+
+T = TypeVar("T")
+
+SEARCH_TERM = re.compile(r"\w+")
 
-from .schemas import ProductCreate, ProductUpdate, ProductUpdatePartial
 
+def chunked(items: Sequence[T], size: int) -> list[tuple[int, Sequence[T]]]:
+    return [
+        (start, items[start : start + size]) for start in range(0, len(items), size)
+    ]
 
-async def get_products(session: AsyncSession) -> list[Product]:
-    statement = select(Product).order_by(Product.id)
+
+async def get_products(
+    session: AsyncSession,
+    limit: int,
+    after: int | None = None,
+) -> list[Product]:
+    # keyset pagination: seek past the last seen id instead of OFFSET,
+    # so every page is a primary key range scan of `limit` rows
+    statement = select(Product).order_by(Product.id).limit(limit)
+    if after is not None:
+        statement = statement.where(Product.id > after)
     result: Result = await session.execute(statement)
     products = result.scalars().all()
     return list(products)
 
 
+async def get_product_rows(
+    session: AsyncSession,
+    limit: int,
+    after: int | None = None,
+    fields: Sequence[str] = PRODUCT_FIELDS,
+) -> Sequence[Row]:
+    # same page as get_products, as plain rows of only the requested columns
+    statement = (
+        select(*(getattr(Product, name) for name in fields))
+        .order_by(Product.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(Product.id > after)
+    result: Result = await session.execute(statement)
+    return result.all()
+
+
+def product_payload(product: Product) -> dict:
+    return {name: getattr(product, name) for name in PRODUCT_FIELDS}
+
+
+def product_event(type: str, product_id: int, payload: dict) -> dict:
+    # an outbox row, for add_events
+    return {
+        "type": type,
+        "aggregate": "product",
+        "aggregate_id": product_id,
+        "payload": payload,
+    }
+
+
+def match_expression(query: str) -> str | None:
+    terms = SEARCH_TERM.findall(query)
+    if not terms:
+        return None
+    # quoted terms are never parsed as FTS5 operators,
+    # the last one matches as a prefix so partial words find something
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def select_matching_products(match: str) -> Select:
+    # rank is bm25 with name matches weighted up, see core.models.product_search
+    return (
+        select(Product)
+        .join(products_fts, products_fts.c.rowid == Product.id)
+        .where(products_fts.c.products_fts.op("MATCH")(match))
+        .order_by(products_fts.c.rank, Product.id)
+    )
+
+
+async def search_products(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    offset: int = 0,
+) -> list[Product]:
+    match = match_expression(query)
+    if match is None:
+        return []
+    statement = select_matching_products(match).limit(limit).offset(offset)
+    result: Result = await session.execute(statement)
+    return list(result.scalars().all())
+
+
+async def search_product_rows(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    offset: int = 0,
+    fields: Sequence[str] = PRODUCT_FIELDS,
+) -> Sequence[Row]:
+    match = match_expression(query)
+    if match is None:
+        return []
+    statement = (
+        select_matching_products(match)
+        .with_only_columns(*(getattr(Product, name) for name in fields))
+        .limit(limit)
+        .offset(offset)
+    )
+    result: Result = await session.execute(statement)
+    return result.all()
+
+
+async def get_products_version(session: AsyncSession) -> int:
+    # bumped by a trigger on every products write, see core.models.table_version
+    version = await session.scalar(
+        select(TableVersion.version).where(
+            TableVersion.name == Product.__tablename__,
+        )
+    )
+    return version or 0
+
+
+async def stream_products(
+    session: AsyncSession,
+    chunk_size: int,
+) -> AsyncIterator[Sequence[Row]]:
+    # server-side cursor: rows are fetched `chunk_size` at a time
+    # and handed out before the next chunk is requested
+    statement = (
+        select(Product.id, Product.name, Product.description, Product.price)
+        .order_by(Product.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(statement)
+    async for rows in result.partitions():
+        yield rows
+
+
 async def get_product(session: AsyncSession, product_id: int) -> Product | None:
     return await session.get(Product, product_id)
 
@@ -27,20 +169,77 @@ async def get_product(session: AsyncSession, product_id: int) -> Product | None:
 async def create_product(session: AsyncSession, product: ProductCreate) -> Product:
     product = Product(**product.model_dump())
     session.add(product)
+    await session.flush()
+    add_event(
+        session, "product.created", "product", product.id, product_payload(product)
+    )
     await session.commit()
     await session.refresh(product)
+    await invalidate_product(product.id)
     return product
 
 
+class ProductVersionMismatch(Exception):
+    def __init__(self, product_id: int, current_version: int):
+        self.product_id = product_id
+        self.current_version = current_version
+        super().__init__(
+            f"Product {product_id} is at version {current_version}",
+        )
+
+
+class NullFields(Exception):
+    def __init__(self, fields: Sequence[str]):
+        self.fields = fields
+        super().__init__(f"Fields may not be null: {', '.join(fields)}")
+
+
+def null_fields(values: dict[str, Any]) -> list[str]:
+    # partial updates accept null for "unset", the columns don't
+    return [name for name, value in values.items() if value is None]
+
+
 async def update_product(
     session: AsyncSession,
-    product: Product,
+    product_id: int,
     product_update: ProductUpdate | ProductUpdatePartial,
+    versions: Sequence[int] | None,
     partial: bool = False,
-) -> Product:
-    for name, value in product_update.model_dump(exclude_unset=partial).items():
-        setattr(product, name, value)
+) -> Product | None:
+    """
+    Compare-and-set in one UPDATE ... WHERE id AND version RETURNING.
+
+    `versions` are the versions the client may overwrite, None for any.
+    Returns None when the product doesn't exist.
+    """
+    values = product_update.model_dump(exclude_unset=partial)
+    if fields := null_fields(values):
+        raise NullFields(fields)
+    statement = (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(**values, version=Product.version + 1)
+        .returning(Product)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        statement = statement.where(Product.version.in_(versions))
+    product = await session.scalar(statement)
+    if product is None:
+        # nothing matched, only now pay for a read to tell why
+        current_version = await session.scalar(
+            select(Product.version).where(Product.id == product_id),
+        )
+        await session.rollback()
+        if current_version is None:
+            return None
+        raise ProductVersionMismatch(product_id, current_version)
+    add_event(
+        session, "product.updated", "product", product_id, product_payload(product)
+    )
     await session.commit()
+    await invalidate_product(product_id)
+    await publish_product_update(product_payload(product))
     return product
 
 
@@ -49,4 +248,149 @@ async def delete_product(
     product: Product,
 ) -> None:
     await session.delete(product)
+    add_event(session, "product.deleted", "product", product.id, {"id": product.id})
+    await session.commit()
+    await invalidate_product(product.id)
+
+
+async def create_products(
+    session: AsyncSession,
+    products: Sequence[ProductCreate],
+    batch_size: int,
+) -> list[Product]:
+    created: list[Product] = []
+    for _, chunk in chunked(products, batch_size):
+        # one multi-row INSERT ... RETURNING per chunk; asking for
+        # sort_by_parameter_order would make SQLite insert row by row,
+        # ids are handed out in VALUES order anyway
+        result = await session.scalars(
+            insert(Product).returning(Product),
+            [product.model_dump() for product in chunk],
+        )
+        chunk_created = sorted(result.all(), key=lambda product: product.id)
+        await add_events(
+            session,
+            [
+                product_event("product.created", product.id, product_payload(product))
+                for product in chunk_created
+            ],
+        )
+        created.extend(chunk_created)
+    await session.commit()
+    return created
+
+
+async def update_products(
+    session: AsyncSession,
+    products_update: Sequence[ProductBulkUpdate],
+    batch_size: int,
+) -> tuple[list[Product], list[BulkItemError]]:
+    """
+    Items carrying a `version` are compare-and-set, a mismatch is reported
+    in the errors; items without one are last-writer-wins.
+
+    Raises StaleDataError when a product changes between the version read
+    and the UPDATE, nothing is committed then.
+    """
+    errors: list[BulkItemError] = []
+    updated_ids: list[int] = []
+    # a repeat would be checked against a version this batch already bumped
+    seen: set[int] = set()
+    for start, chunk in chunked(products_update, batch_size):
+        # current versions, the ORM checks and bumps them per row
+        versions = dict(
+            (
+                await session.execute(
+                    select(Product.id, Product.version).where(
+                        Product.id.in_([item.id for item in chunk]),
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+        params = []
+        for index, item in enumerate(chunk, start=start):
+            values = item.model_dump(exclude_unset=True, exclude={"version"})
+            duplicate = item.id in seen
+            seen.add(item.id)
+            if duplicate:
+                detail = f"Product {item.id} appears more than once"
+            elif item.id not in versions:
+                detail = f"Product {item.id} not found"
+            elif item.version is not None and item.version != versions[item.id]:
+                detail = f"Product {item.id} is at version {versions[item.id]}"
+            elif fields := null_fields(values):
+                detail = str(NullFields(fields))
+            else:
+                params.append({**values, "version": versions[item.id]})
+                updated_ids.append(item.id)
+                continue
+            errors.append(BulkItemError(index=index, id=item.id, detail=detail))
+
+        if params:
+            # ORM bulk UPDATE by primary key, executemany per set of keys
+            await session.execute(update(Product), params)
+
+    # read back before committing, the events go out in the same transaction
+    products: list[Product] = []
+    for _, chunk in chunked(updated_ids, batch_size):
+        result = await session.scalars(
+            select(Product)
+            .where(Product.id.in_(chunk))
+            .order_by(Product.id)
+            .execution_options(populate_existing=True),
+        )
+        chunk_updated = result.all()
+        await add_events(
+            session,
+            [
+                product_event("product.updated", product.id, product_payload(product))
+                for product in chunk_updated
+            ],
+        )
+        products.extend(chunk_updated)
     await session.commit()
+
+    for product in products:
+        await invalidate_product(product.id)
+        await publish_product_update(product_payload(product))
+    return products, errors
+
+
+async def delete_products(
+    session: AsyncSession,
+    product_ids: Sequence[int],
+    batch_size: int,
+) -> tuple[list[int], list[BulkItemError]]:
+    errors: list[BulkItemError] = []
+    deleted_ids: list[int] = []
+    seen: set[int] = set()
+    for start, chunk in chunked(product_ids, batch_size):
+        result = await session.scalars(
+            delete(Product).where(Product.id.in_(chunk)).returning(Product.id),
+        )
+        deleted = set(result.all())
+        for index, product_id in enumerate(chunk, start=start):
+            duplicate = product_id in seen
+            seen.add(product_id)
+            if duplicate:
+                detail = f"Product {product_id} appears more than once"
+            elif product_id in deleted:
+                deleted_ids.append(product_id)
+                continue
+            else:
+                detail = f"Product {product_id} not found"
+            errors.append(BulkItemError(index=index, id=product_id, detail=detail))
+    await add_events(
+        session,
+        [
+            product_event("product.deleted", product_id, {"id": product_id})
+            for product_id in deleted_ids
+        ],
+    )
+    await session.commit()
+
+    for product_id in deleted_ids:
+        await invalidate_product(product_id)
+    return deleted_ids, errors
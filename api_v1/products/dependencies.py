@@ -1,10 +1,12 @@
 from typing import Annotated
-from fastapi import Path, Depends, HTTPException, status
+from fastapi import Path, Query, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.models import db_helper, Product
 
-from . import crud
+from . import crud, schemas
+from .cache import product_cache, product_lookups
 
 
 async def product_by_id(
@@ -20,3 +22,56 @@ async def product_by_id(
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND, detail=f"Product {product_id} not found"
     )
+
+
+async def cached_product_by_id(
+    product_id: Annotated[int, Path],
+) -> schemas.Product:
+    async def fetch() -> schemas.Product | None:
+        # shared by every coalesced request, so it can't borrow a request's session
+        async with db_helper.read_session() as session:
+            product = await crud.get_product(session=session, product_id=product_id)
+        if product is None:
+            return None
+        return schemas.Product.model_validate(product)
+
+    async def load() -> schemas.Product | None:
+        return await product_lookups.do(product_id, fetch)
+
+    if settings.products.cache.enabled:
+        product = await product_cache.get_or_load(product_id, load)
+    else:
+        product = await load()
+    if product is not None:
+        return product
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail=f"Product {product_id} not found"
+    )
+
+
+PageLimit = Annotated[
+    int,
+    Query(ge=1, le=settings.products.max_page_size),
+]
+
+
+def product_fields(
+    fields: Annotated[
+        str | None,
+        Query(description="Comma separated Product fields, id is always included"),
+    ] = None,
+) -> tuple[str, ...] | None:
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if unknown := requested.difference(schemas.PRODUCT_FIELDS):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown product fields: {', '.join(sorted(unknown))}",
+        )
+    # schema order, so equal field sets share one projection model;
+    # id is needed for cursors
+    return tuple(
+        name for name in schemas.PRODUCT_FIELDS if name in requested or name == "id"
+    )
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy.engine import Row
+
+from core.config import settings
+from core.models import db_helper
+
+from . import crud
+from .schemas import ExportFormat
+
+EXPORT_COLUMNS = ("id", "name", "description", "price")
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def encode_ndjson(rows: Sequence[Row]) -> str:
+    return "".join(json.dumps(row._asdict(), ensure_ascii=False) + "\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[Row]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_products(export_format: ExportFormat) -> AsyncIterator[str]:
+    # the response outlives the request dependencies,
+    # so the stream owns its session
+    if export_format is ExportFormat.csv:
+        encode = encode_csv
+        yield encode_csv([EXPORT_COLUMNS])
+    else:
+        encode = encode_ndjson
+
+    async with db_helper.session_factory() as session:
+        async for rows in crud.stream_products(
+            session=session,
+            chunk_size=settings.products.export_chunk_size,
+        ):
+            yield encode(rows)
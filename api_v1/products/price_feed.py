@@ -0,0 +1,70 @@
+import json
+from typing import Any, AsyncIterator
+
+from core.config import settings
+from core.models import db_helper
+from core.pubsub import (
+    Broker,
+    InMemoryPubSub,
+    OutboxPubSub,
+    PubSubBackend,
+    SlowConsumer,
+)
+
+# the outbox event type, so the outbox backend can tail it as is
+CHANNEL = "product.updated"
+HEARTBEAT = json.dumps({"type": "heartbeat"})
+
+
+def make_backend(name: str) -> PubSubBackend:
+    if name == "outbox":
+        return OutboxPubSub(
+            db_helper, poll_interval=settings.products.price_feed.poll_interval
+        )
+    return InMemoryPubSub()
+
+
+price_backend = make_backend(settings.products.price_feed.backend)
+price_broker = Broker(
+    name="prices",
+    queue_size=settings.products.price_feed.queue_size,
+    max_subscribers=settings.products.price_feed.max_subscribers,
+)
+
+
+async def publish_product_update(payload: dict[str, Any]) -> None:
+    # after commit; payload as in the product.updated outbox event
+    await price_backend.publish(CHANNEL, payload)
+
+
+def price_message(payload: dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            "type": "price",
+            "id": payload["id"],
+            "price": payload["price"],
+            "version": payload["version"],
+        }
+    )
+
+
+async def run_price_feed() -> None:
+    # one backend subscription per worker, fanned out by the broker
+    async for payload in price_backend.subscribe(CHANNEL):
+        price_broker.publish(price_message(payload))
+
+
+async def price_events() -> AsyncIterator[str]:
+    """Server-Sent Events, a comment line when idle keeps proxies from timing out."""
+    heartbeat_interval = settings.products.price_feed.heartbeat_interval
+    with price_broker.subscribe() as subscriber:
+        while True:
+            try:
+                message = await subscriber.get(heartbeat_interval)
+            except SlowConsumer:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            if message is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield f"event: price\ndata: {message}\n\n"
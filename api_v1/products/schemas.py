@@ -1,4 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from enum import Enum
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from typing_extensions import TypedDict
 
 
 class ProductBase(BaseModel):
@@ -24,3 +28,75 @@ class ProductUpdatePartial(ProductCreate):
 class Product(ProductBase):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    version: int
+
+
+class ProductsPage(BaseModel):
+    items: list[Product]
+    next_cursor: str | None = None
+
+
+PRODUCT_FIELDS = tuple(Product.model_fields)
+
+
+@lru_cache
+def product_projection(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Product with only `fields`, for sparse fieldset responses."""
+    return create_model(
+        "ProductFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (Product.model_fields[name].annotation, ...) for name in fields},
+    )
+
+
+@lru_cache
+def products_page_projection(fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        "ProductsFieldsPage",
+        items=(list[product_projection(fields)], ...),
+        next_cursor=(str | None, None),
+    )
+
+
+class ProductRow(TypedDict):
+    name: str
+    description: str
+    price: int
+    id: int
+    version: int
+
+
+class ProductRowsPage(TypedDict):
+    items: list[ProductRow]
+    next_cursor: str | None
+
+
+# same JSON as ProductsPage, built once and serialized by pydantic-core
+products_page_json = TypeAdapter(ProductRowsPage)
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ProductBulkUpdate(ProductUpdatePartial):
+    id: int
+    # applied only while the product is at this version, unset overwrites
+    version: int | None = None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    id: int | None = None
+    detail: str
+
+
+class ProductsBulkResult(BaseModel):
+    items: list[Product]
+    errors: list[BulkItemError] = []
+
+
+class ProductsBulkDeleteResult(BaseModel):
+    deleted: list[int]
+    errors: list[BulkItemError] = []
@@ -1,22 +1,133 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+from functools import partial
+from typing import Annotated, Awaitable, Callable, Sequence, TypeVar
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    status,
+    Depends,
+    Query,
+    Body,
+    Header,
+    Path,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
 from core.models import db_helper
+from core.config import settings
+from core.pubsub import SlowConsumer
+from ..conditional import make_etag, etag_matches, if_match_versions, not_modified
+from ..pagination import after_cursor, encode_cursor
 from . import crud
-from .schemas import Product, ProductCreate, ProductUpdate, ProductUpdatePartial
-from .dependencies import product_by_id
+from .cache import product_pages
+from .price_feed import HEARTBEAT, price_broker, price_events
+from .export import export_products, MEDIA_TYPES
+from .schemas import (
+    ExportFormat,
+    Product,
+    ProductCreate,
+    ProductUpdate,
+    ProductUpdatePartial,
+    ProductsPage,
+    ProductBulkUpdate,
+    ProductsBulkResult,
+    ProductsBulkDeleteResult,
+    products_page_json,
+    PRODUCT_FIELDS,
+    product_projection,
+    products_page_projection,
+)
+from .dependencies import (
+    product_by_id,
+    cached_product_by_id,
+    product_fields,
+    PageLimit,
+)
+
+T = TypeVar("T")
 
 router = APIRouter(tags=["products"])
 
+BulkMaxItems = Body(min_length=1, max_length=settings.products.bulk_max_items)
+
+
+def product_rows_page(
+    rows: Sequence[Row],
+    fields: tuple[str, ...],
+    next_cursor: str | None,
+    headers: dict[str, str],
+) -> Response:
+    # serialized straight from the rows, no ORM objects and no response_model pass
+    items = [row._asdict() for row in rows]
+    if fields == PRODUCT_FIELDS:
+        content = products_page_json.dump_json(
+            {"items": items, "next_cursor": next_cursor},
+        )
+    else:
+        page_model = products_page_projection(fields)
+        content = page_model(items=items, next_cursor=next_cursor).model_dump_json()
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def in_own_session(query: Callable[..., Awaitable[T]], **kwargs) -> T:
+    # coalesced queries outlive the request that started them,
+    # so they can't run on its session, and waiters must not hold
+    # a connection the query itself may need
+    async with db_helper.read_session() as session:
+        return await query(session=session, **kwargs)
 
-@router.get("/", response_model=list[Product])
+
+@router.get("/", response_model=ProductsPage)
 async def get_products(
-    session: AsyncSession = Depends(
-        db_helper.scoped_session_dependency,
-    )
+    response: Response,
+    limit: PageLimit = settings.products.page_size,
+    after: int | None = Depends(after_cursor),
+    fields: tuple[str, ...] | None = Depends(product_fields),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    products = await crud.get_products(session=session)
-    return products
+    # read before the page, a write in between only makes the etag stale;
+    # no connection is held while waiting on a coalesced page
+    etag = make_etag("products", await in_own_session(crud.get_products_version))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if fields is not None or settings.products.fast_serialization:
+        fields = fields or PRODUCT_FIELDS
+        rows = await product_pages.do(
+            (etag, limit, after, fields),
+            partial(
+                in_own_session,
+                crud.get_product_rows,
+                limit=limit + 1,
+                after=after,
+                fields=fields,
+            ),
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].id)
+        return product_rows_page(rows, fields, next_cursor, {"ETag": etag})
+
+    # fetch one extra row to know whether there is a next page
+    products = await product_pages.do(
+        (etag, limit, after, None),
+        partial(in_own_session, crud.get_products, limit=limit + 1, after=after),
+    )
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1].id)
+    return ProductsPage(items=products, next_cursor=next_cursor)
 
 
 @router.post(
@@ -26,44 +137,280 @@ async def get_products(
 )
 async def create_product(
     product: ProductCreate,
+    response: Response,
+    session: AsyncSession = Depends(
+        db_helper.session_dependency,
+    ),
+):
+    product = await crud.create_product(product=product, session=session)
+    # what the first If-Match needs
+    response.headers["ETag"] = make_etag(product.id, product.version)
+    return product
+
+
+@router.get("/search/", response_model=ProductsPage)
+async def search_products(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: PageLimit = settings.products.page_size,
+    after: int | None = Depends(after_cursor),
+    fields: tuple[str, ...] | None = Depends(product_fields),
+    session: AsyncSession = Depends(
+        db_helper.read_session_dependency,
+    ),
+):
+    # results are ordered by rank, not id, so the cursor holds an offset
+    offset = after or 0
+    if fields is not None:
+        rows = await crud.search_product_rows(
+            session=session,
+            query=q,
+            limit=limit + 1,
+            offset=offset,
+            fields=fields,
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(offset + limit)
+        return product_rows_page(rows, fields, next_cursor, {})
+    products = await crud.search_products(
+        session=session,
+        query=q,
+        limit=limit + 1,
+        offset=offset,
+    )
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(offset + limit)
+    return ProductsPage(items=products, next_cursor=next_cursor)
+
+
+@router.get("/export/")
+async def export_products_catalog(
+    export_format: Annotated[
+        ExportFormat,
+        Query(alias="format"),
+    ] = ExportFormat.ndjson,
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_products(export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=products.{export_format.value}",
+        },
+    )
+
+
+@router.get("/stream/")
+async def stream_prices() -> StreamingResponse:
+    # committed price changes as Server-Sent Events
+    if price_broker.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many price feed subscribers",
+        )
+    return StreamingResponse(
+        price_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/ws/")
+async def stream_prices_ws(websocket: WebSocket) -> None:
+    # the same messages as JSON text frames
+    if price_broker.full:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    await websocket.accept()
+    heartbeat_interval = settings.products.price_feed.heartbeat_interval
+
+    async def send_prices() -> None:
+        while True:
+            message = await subscriber.get(heartbeat_interval)
+            await websocket.send_text(message or HEARTBEAT)
+
+    async def wait_for_disconnect() -> None:
+        # nothing is expected from the client, but a closed socket
+        # has to be noticed even while no prices change
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    with price_broker.subscribe() as subscriber:
+        tasks = [
+            asyncio.create_task(send_prices()),
+            asyncio.create_task(wait_for_disconnect()),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        error = next(iter(done)).exception()
+        if isinstance(error, SlowConsumer):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        elif error is not None and not isinstance(error, WebSocketDisconnect):
+            raise error
+
+
+@router.post(
+    "/bulk/",
+    response_model=ProductsBulkResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_products_bulk(
+    products: Annotated[list[ProductCreate], BulkMaxItems],
     session: AsyncSession = Depends(
         db_helper.session_dependency,
     ),
 ):
-    return await crud.create_product(product=product, session=session)
+    created = await crud.create_products(
+        session=session,
+        products=products,
+        batch_size=settings.products.bulk_batch_size,
+    )
+    return ProductsBulkResult(items=created)
+
+
+@router.patch("/bulk/", response_model=ProductsBulkResult)
+async def update_products_bulk(
+    products_update: Annotated[list[ProductBulkUpdate], BulkMaxItems],
+    session: AsyncSession = Depends(
+        db_helper.session_dependency,
+    ),
+):
+    try:
+        updated, errors = await crud.update_products(
+            session=session,
+            products_update=products_update,
+            batch_size=settings.products.bulk_batch_size,
+        )
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bulk update rolled back: {exc.orig}",
+        )
+    except StaleDataError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bulk update rolled back: products changed concurrently",
+        )
+    return ProductsBulkResult(items=updated, errors=errors)
+
+
+@router.delete("/bulk/", response_model=ProductsBulkDeleteResult)
+async def delete_products_bulk(
+    product_ids: Annotated[list[int], BulkMaxItems],
+    session: AsyncSession = Depends(
+        db_helper.session_dependency,
+    ),
+):
+    try:
+        deleted, errors = await crud.delete_products(
+            session=session,
+            product_ids=product_ids,
+            batch_size=settings.products.bulk_batch_size,
+        )
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bulk delete rolled back: {exc.orig}",
+        )
+    return ProductsBulkDeleteResult(deleted=deleted, errors=errors)
 
 
 @router.get("/{product_id}/", response_model=Product)
-async def get_product(product: Product = Depends(product_by_id)) -> Product:
+async def get_product(
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    fields: tuple[str, ...] | None = Depends(product_fields),
+    product: Product = Depends(cached_product_by_id),
+):
+    etag = make_etag(product.id, product.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if fields is not None:
+        # the cached product has every field, only the payload is trimmed
+        projected = product_projection(fields).model_validate(product)
+        return Response(
+            content=projected.model_dump_json(),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+    response.headers["ETag"] = etag
+    return product
+
+
+async def update_product_if_match(
+    session: AsyncSession,
+    response: Response,
+    product_id: int,
+    if_match: str | None,
+    product_update: ProductUpdate | ProductUpdatePartial,
+    partial: bool = False,
+):
+    try:
+        product = await crud.update_product(
+            session=session,
+            product_id=product_id,
+            product_update=product_update,
+            versions=if_match_versions(if_match, product_id),
+            partial=partial,
+        )
+    except crud.ProductVersionMismatch as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(exc),
+            headers={"ETag": make_etag(product_id, exc.current_version)},
+        )
+    except crud.NullFields as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        )
+    if product is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product {product_id} not found",
+        )
+    response.headers["ETag"] = make_etag(product.id, product.version)
     return product
 
 
 @router.put("/{product_id}/")
 async def update_product(
+    product_id: Annotated[int, Path],
     product_update: ProductUpdate,
-    product: Product = Depends(product_by_id),
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(
         db_helper.session_dependency,
     ),
 ):
-    return await crud.update_product(
+    return await update_product_if_match(
         session=session,
-        product=product,
+        response=response,
+        product_id=product_id,
+        if_match=if_match,
         product_update=product_update,
     )
 
 
 @router.patch("/{product_id}/")
 async def update_product_partial(
+    product_id: Annotated[int, Path],
     product_update: ProductUpdatePartial,
-    product: Product = Depends(product_by_id),
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(
         db_helper.session_dependency,
     ),
 ):
-    return await crud.update_product(
+    return await update_product_if_match(
         session=session,
-        product=product,
+        response=response,
+        product_id=product_id,
+        if_match=if_match,
         product_update=product_update,
         partial=True,
     )
@@ -76,7 +423,16 @@ async def delete_product(
         db_helper.session_dependency,
     ),
 ) -> None:
-    await crud.delete_product(
-        session=session,
-        product=product,
-    )
+    # read now, a failed flush expires the instance
+    product_id = product.id
+    try:
+        await crud.delete_product(
+            session=session,
+            product=product,
+        )
+    except StaleDataError:
+        # updated or deleted since it was loaded
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Product {product_id} changed concurrently",
+        )
@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+
+from core.cache import LRUCache
+
+from .passwords import ScryptParams, hash_password, needs_rehash, verify_password
+
+
+def make_hash_executor(
+    kind: Literal["thread", "process"],
+    workers: int,
+) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+
+class CredentialStore:
+    """
+    Username -> password hash store for Basic auth.
+
+    Hashing runs on `executor`, never on the event loop.
+    Successful verifications are remembered for `cache_ttl` seconds,
+    keyed by an HMAC of the credentials under a per-process random key,
+    so the cache never holds anything that could be replayed elsewhere.
+    Hashes made with outdated parameters are upgraded on the next login.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        params: ScryptParams = ScryptParams(),
+        cache_ttl: float = 60.0,
+        cache_max_size: int = 10_000,
+    ):
+        self.executor = executor
+        self.params = params
+        self.verified = LRUCache(max_size=cache_max_size, ttl=cache_ttl)
+        self._hashes: dict[str, str] = {}
+        self._cache_key = secrets.token_bytes(32)
+        # verified against for unknown users, so they cost the same as known ones
+        self._dummy_hash = hash_password(secrets.token_urlsafe(), params)
+
+    def set_hash(self, username: str, encoded: str) -> None:
+        self._hashes[username] = encoded
+
+    def set_password(self, username: str, password: str) -> None:
+        self.set_hash(username, hash_password(password, self.params))
+
+    def _cache_token(self, username: str, password: str) -> bytes:
+        message = username.encode("utf-8") + b"\0" + password.encode("utf-8")
+        return hmac.new(self._cache_key, message, hashlib.sha256).digest()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def verify(self, username: str, password: str) -> bool:
+        encoded = self._hashes.get(username)
+        if encoded is None:
+            await self._run(verify_password, password, self._dummy_hash)
+            return False
+
+        token = self._cache_token(username, password)
+        # the cached hash must still be current, a password change is a miss
+        if self.verified.get(token) == encoded:
+            return True
+
+        if not await self._run(verify_password, password, encoded):
+            return False
+
+        if needs_rehash(encoded, self.params):
+            encoded = await self._run(hash_password, password, self.params)
+            self.set_hash(username, encoded)
+        self.verified.set(token, encoded)
+        return True
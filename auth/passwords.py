@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import hmac
+import os
+from dataclasses import dataclass
+
+SCRYPT_ALGORITHM = "scrypt"
+
+
+@dataclass(frozen=True)
+class ScryptParams:
+    n: int = 2**14
+    r: int = 8
+    p: int = 1
+    salt_size: int = 16
+    key_size: int = 32
+
+    @property
+    def maxmem(self) -> int:
+        # scrypt needs 128 * r * n bytes, leave headroom over that
+        return 2 * 128 * self.r * self.n + 1024 * 1024
+
+
+def b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def derive_key(password: str, salt: bytes, params: ScryptParams) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=params.n,
+        r=params.r,
+        p=params.p,
+        dklen=params.key_size,
+        maxmem=params.maxmem,
+    )
+
+
+def hash_password(password: str, params: ScryptParams) -> str:
+    """Encode as `scrypt$n$r$p$salt$key` so parameters can change later."""
+    salt = os.urandom(params.salt_size)
+    key = derive_key(password, salt, params)
+    return "$".join(
+        (
+            SCRYPT_ALGORITHM,
+            str(params.n),
+            str(params.r),
+            str(params.p),
+            b64encode(salt),
+            b64encode(key),
+        )
+    )
+
+
+def parse_hash(encoded: str) -> tuple[ScryptParams, bytes, bytes]:
+    algorithm, n, r, p, salt, key = encoded.split("$")
+    if algorithm != SCRYPT_ALGORITHM:
+        raise ValueError(f"Unsupported password hash {algorithm!r}")
+    salt_bytes, key_bytes = b64decode(salt), b64decode(key)
+    params = ScryptParams(
+        n=int(n),
+        r=int(r),
+        p=int(p),
+        salt_size=len(salt_bytes),
+        key_size=len(key_bytes),
+    )
+    return params, salt_bytes, key_bytes
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    params, salt, key = parse_hash(encoded)
+    return hmac.compare_digest(derive_key(password, salt, params), key)
+
+
+def needs_rehash(encoded: str, params: ScryptParams) -> bool:
+    return parse_hash(encoded)[0] != params
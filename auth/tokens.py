@@ -0,0 +1,144 @@
+import base64
+import binascii
+import hashlib
+import heapq
+import hmac
+import json
+import secrets
+import threading
+import time
+from typing import Any, Callable
+
+ALGORITHM = "HS256"
+
+
+class TokenError(Exception):
+    pass
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class RevocationList:
+    """
+    Revoked token ids, kept only until the token would have expired anyway.
+
+    Bounded to `max_size`: when full, the entry closest to expiry is dropped.
+    """
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._expiry: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def _purge(self, now: float) -> None:
+        while self._heap and (
+            self._heap[0][0] <= now or len(self._expiry) > self.max_size
+        ):
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expiry.get(jti) == expires_at:
+                del self._expiry[jti]
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._expiry[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+            self._purge(self._clock())
+
+
+class TokenSigner:
+    """
+    HMAC-signed, JWT-compatible (HS256) tokens verified without any store lookup.
+
+    `keys` maps key ids to secrets. New tokens are signed with `active_key_id`,
+    tokens signed with any other key in `keys` keep verifying until it's removed,
+    which is how keys are rotated.
+    """
+
+    def __init__(
+        self,
+        keys: dict[str, str],
+        active_key_id: str,
+        ttl: float,
+        revoked: RevocationList,
+        clock: Callable[[], float] = time.time,
+    ):
+        if active_key_id not in keys:
+            raise ValueError(f"Unknown active key id {active_key_id!r}")
+        self.keys = {kid: secret.encode("utf-8") for kid, secret in keys.items()}
+        self.active_key_id = active_key_id
+        self.ttl = ttl
+        self.revoked = revoked
+        self._clock = clock
+
+    @staticmethod
+    def _sign(key: bytes, signing_input: bytes) -> bytes:
+        return hmac.new(key, signing_input, hashlib.sha256).digest()
+
+    @staticmethod
+    def _encode_part(data: dict[str, Any]) -> str:
+        return b64url_encode(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    def issue(self, subject: str) -> str:
+        now = int(self._clock())
+        header = {"alg": ALGORITHM, "typ": "JWT", "kid": self.active_key_id}
+        payload = {
+            "sub": subject,
+            "iat": now,
+            "exp": now + int(self.ttl),
+            "jti": secrets.token_urlsafe(16),
+        }
+        signing_input = f"{self._encode_part(header)}.{self._encode_part(payload)}"
+        signature = self._sign(
+            self.keys[self.active_key_id],
+            signing_input.encode("ascii"),
+        )
+        return f"{signing_input}.{b64url_encode(signature)}"
+
+    def decode(self, token: str) -> dict[str, Any]:
+        # UnicodeEncodeError / UnicodeDecodeError are ValueErrors too
+        try:
+            header_part, payload_part, signature_part = token.split(".")
+            signing_input = f"{header_part}.{payload_part}".encode("ascii")
+            header = json.loads(b64url_decode(header_part))
+            signature = b64url_decode(signature_part)
+        except (ValueError, binascii.Error):
+            raise TokenError("Malformed token")
+        if not isinstance(header, dict) or not isinstance(header.get("kid"), str):
+            raise TokenError("Malformed token")
+
+        key = self.keys.get(header["kid"])
+        if header.get("alg") != ALGORITHM or key is None:
+            raise TokenError("Unknown signing key")
+        expected = self._sign(key, signing_input)
+        if not hmac.compare_digest(signature, expected):
+            raise TokenError("Invalid signature")
+
+        try:
+            payload = json.loads(b64url_decode(payload_part))
+        except (ValueError, binascii.Error):
+            raise TokenError("Malformed token")
+        if not isinstance(payload, dict):
+            raise TokenError("Malformed token")
+        if payload["exp"] <= self._clock():
+            raise TokenError("Token expired")
+        if payload["jti"] in self.revoked:
+            raise TokenError("Token revoked")
+        return payload
+
+    def revoke(self, payload: dict[str, Any]) -> None:
+        self.revoked.add(payload["jti"], payload["exp"])
@@ -0,0 +1,160 @@
+"""
+Load-test the microshop API against a freshly seeded SQLite database.
+
+    python -m benchmarks --concurrency 32 --iterations 5000 --output results.json
+    python -m benchmarks --mode uvicorn --workers 4 --baseline results.json
+
+`in-process` drives `main:app` through httpx's ASGI transport, client and
+app share one event loop. `uvicorn` starts real server processes and goes
+over TCP. With --baseline the run fails when p95 latency or throughput
+regresses by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .database import ROOT, configure_database, seed_database
+from .runner import compare, format_table, run_load
+from .scenarios import SCENARIOS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--mode", choices=("in-process", "uvicorn"), default="in-process"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"comma separated, out of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--products", type=int, default=1000, help="rows to seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "microshop-benchmark.sqlite3",
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {server.returncode}")
+        try:
+            httpx.get(f"{base_url}/", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"uvicorn not ready after {timeout}s")
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    scenarios = [SCENARIOS[name] for name in args.scenarios.split(",")]
+    load = dict(
+        scenarios=scenarios,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        product_ids=args.products,
+        seed=args.seed,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    if args.mode == "in-process":
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=transport,
+                base_url="http://benchmark",
+            ) as client:
+                return await run_load(client, **load)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT,
+        env=os.environ,
+    )
+    try:
+        await asyncio.to_thread(wait_until_ready, base_url, server, 30.0)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            return await run_load(client, **load)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> int:
+    args = parse_args()
+    configure_database(args.db)
+    # contention under load makes the slow query log drown the report
+    logging.getLogger("db.slow_query").setLevel(logging.ERROR)
+    seed_database(args.db, args.products)
+
+    results = asyncio.run(run(args))
+    results["config"] = {
+        "mode": args.mode,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "scenarios": args.scenarios,
+        "products": args.products,
+    }
+    print(format_table(results))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def configure_database(path: Path) -> None:
+    # read by core.config in this process and in any uvicorn workers,
+    # so it has to be set before anything imports core
+    os.environ["DB"] = json.dumps({"url": f"sqlite+aiosqlite:///{path}"})
+    sys.path.insert(0, str(ROOT))
+
+
+def seed_database(path: Path, products: int) -> None:
+    from sqlalchemy import create_engine, insert
+
+    from core.models import Base, Product
+
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Product),
+            [
+                {
+                    "name": f"Product {i}",
+                    "description": f"Benchmark product {i}",
+                    "price": 100 + i % 900,
+                }
+                for i in range(1, products + 1)
+            ],
+        )
+    engine.dispose()
@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Sequence
+
+import httpx
+
+from .scenarios import Context
+
+Scenario = Callable[[Context], Awaitable[None]]
+
+
+class Recorder:
+    """Times every request issued by the scenarios, by request name."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.measuring = False
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def __call__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        started_at = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started_at
+        if self.measuring:
+            self.latencies[name].append(elapsed)
+            if response.is_error:
+                self.errors[name] += 1
+        # the rest of the scenario usually depends on this response
+        response.raise_for_status()
+        return response
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    rank = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def drive(
+    recorder: Recorder,
+    scenarios: Sequence[Scenario],
+    iterations: int,
+    concurrency: int,
+    product_ids: int,
+    seed: int,
+) -> None:
+    counter = itertools.count()
+
+    async def worker(worker_id: int) -> None:
+        ctx = Context(
+            client=recorder.client,
+            rng=random.Random(seed + worker_id),
+            product_ids=product_ids,
+            record=recorder,
+        )
+        while (iteration := next(counter)) < iterations:
+            try:
+                await scenarios[iteration % len(scenarios)](ctx)
+            except httpx.HTTPStatusError:
+                pass
+
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: Sequence[Scenario],
+    iterations: int,
+    warmup: int,
+    concurrency: int,
+    product_ids: int,
+    seed: int,
+) -> dict[str, Any]:
+    recorder = Recorder(client)
+    if warmup:
+        await drive(recorder, scenarios, warmup, concurrency, product_ids, seed)
+
+    recorder.measuring = True
+    started_at = time.perf_counter()
+    await drive(recorder, scenarios, iterations, concurrency, product_ids, seed)
+    elapsed = time.perf_counter() - started_at
+
+    every_request = list(itertools.chain.from_iterable(recorder.latencies.values()))
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(every_request, sum(recorder.errors.values()), elapsed),
+        "requests": {
+            name: summarize(latencies, recorder.errors[name], elapsed)
+            for name, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """Regressions against `baseline`: p95 slower or rps lower by more than `tolerance`."""
+    regressions = []
+    current = {"total": results["total"], **results["requests"]}
+    expected = {"total": baseline["total"], **baseline["requests"]}
+    for name, before in expected.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        if after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms"
+            )
+        if after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {after['rps']}")
+    return regressions
+
+
+def format_table(results: dict[str, Any]) -> str:
+    columns = ("count", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+    rows = [("request", *columns)]
+    for name, summary in {**results["requests"], "total": results["total"]}.items():
+        rows.append((name, *(str(summary[column]) for column in columns)))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows
+    )
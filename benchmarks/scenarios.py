@@ -0,0 +1,106 @@
+"""
+Request mixes driven by the benchmark runner.
+
+Each scenario issues one or more timed requests through the recorder,
+the latency of every request is reported under its own name.
+"""
+
+import base64
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import httpx
+
+API = "/api/v1"
+BASIC_AUTH = "Basic " + base64.b64encode(b"admin:admin").decode("ascii")
+STATIC_TOKEN = "f89e14d25f30b24a70ad4c0cb745"
+SESSION_COOKIE = "web-app-session-id"
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    rng: random.Random
+    product_ids: int
+    record: Callable[..., Awaitable[httpx.Response]]
+
+    def product_id(self) -> int:
+        return self.rng.randint(1, self.product_ids)
+
+
+async def products_list(ctx: Context) -> None:
+    await ctx.record("products_list", "GET", f"{API}/products/?limit=50")
+
+
+async def products_get(ctx: Context) -> None:
+    await ctx.record("products_get", "GET", f"{API}/products/{ctx.product_id()}/")
+
+
+async def products_crud(ctx: Context) -> None:
+    # works on its own rows so the seeded ones stay readable
+    response = await ctx.record(
+        "products_create",
+        "POST",
+        f"{API}/products/",
+        json={"name": "bench", "description": "benchmark", "price": 100},
+    )
+    product_id = response.json()["id"]
+    await ctx.record(
+        "products_update",
+        "PATCH",
+        f"{API}/products/{product_id}/",
+        json={"price": ctx.rng.randint(1, 1000)},
+        headers={"If-Match": response.headers["ETag"]},
+    )
+    await ctx.record("products_delete", "DELETE", f"{API}/products/{product_id}/")
+
+
+async def auth_basic(ctx: Context) -> None:
+    await ctx.record(
+        "auth_basic",
+        "GET",
+        f"{API}/demo-auth/basic-auth-username/",
+        headers={"Authorization": BASIC_AUTH},
+    )
+
+
+async def auth_token(ctx: Context) -> None:
+    await ctx.record(
+        "auth_token",
+        "GET",
+        f"{API}/demo-auth/some-http-header-auth/",
+        headers={"x-auth-token": STATIC_TOKEN},
+    )
+
+
+async def auth_cookie(ctx: Context) -> None:
+    response = await ctx.record(
+        "auth_login_cookie",
+        "POST",
+        f"{API}/demo-auth/login-cookie/",
+        headers={"x-auth-token": STATIC_TOKEN},
+    )
+    session_id = response.cookies[SESSION_COOKIE]
+    await ctx.record(
+        "auth_check_cookie",
+        "GET",
+        f"{API}/demo-auth/check-cookie/",
+        headers={"Cookie": f"{SESSION_COOKIE}={session_id}"},
+    )
+
+
+async def calc_add(ctx: Context) -> None:
+    a, b = ctx.rng.randint(0, 1000), ctx.rng.randint(0, 1000)
+    await ctx.record("calc_add", "POST", f"/calc/add/?a={a}&b={b}")
+
+
+SCENARIOS: dict[str, Callable[[Context], Awaitable[None]]] = {
+    "products_list": products_list,
+    "products_get": products_get,
+    "products_crud": products_crud,
+    "auth_basic": auth_basic,
+    "auth_token": auth_token,
+    "auth_cookie": auth_cookie,
+    "calc_add": calc_add,
+}
@@ -0,0 +1,107 @@
+"""
+Compare the products list serialization paths on large pages.
+
+    python -m benchmarks.serialization --rows 10000 --requests 30
+
+Runs GET /api/v1/products/?limit=<rows> in process, once through the
+ORM + response_model path and once with products.fast_serialization,
+and reports requests per second and latency for both.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .database import configure_database, seed_database
+from .runner import percentile
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "microshop-serialization.sqlite3",
+    )
+    return parser.parse_args()
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    url: str,
+    requests: int,
+    warmup: int,
+) -> tuple[dict, bytes]:
+    for _ in range(warmup):
+        await client.get(url)
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        request_started_at = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - request_started_at)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    summary = {
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "bytes": len(response.content),
+    }
+    return summary, response.content
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict]:
+    from core.config import settings
+    from main import app
+
+    url = f"{settings.api_v1_prefix}/products/?limit={args.rows}"
+    results = {}
+    bodies = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://benchmark",
+        ) as client:
+            for name, fast in (("orm+response_model", False), ("fast", True)):
+                settings.products.fast_serialization = fast
+                results[name], bodies[name] = await measure(
+                    client,
+                    url,
+                    args.requests,
+                    args.warmup,
+                )
+    if json.loads(bodies["fast"]) != json.loads(bodies["orm+response_model"]):
+        raise RuntimeError("fast path returned a different page")
+    return results
+
+
+def main() -> int:
+    args = parse_args()
+    configure_database(args.db)
+    # the page size is capped when the products router is imported
+    os.environ["PRODUCTS"] = json.dumps({"max_page_size": args.rows})
+    seed_database(args.db, args.rows)
+
+    results = asyncio.run(run(args))
+    for name, summary in results.items():
+        print(f"{name:<20} {summary}")
+    speedup = results["fast"]["rps"] / results["orm+response_model"]["rps"]
+    print(f"fast path: {speedup:.2f}x requests per second")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from .metrics import registry
+
+T = TypeVar("T")
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+cache_stat_totals = {
+    name: registry.counter(
+        f"cache_{name}_total",
+        f"Cache {name.replace('_', ' ')} per namespace.",
+        ("namespace",),
+    )
+    for name in CacheStats.__dataclass_fields__
+}
+cache_entries = registry.gauge(
+    "cache_entries",
+    "Entries in the local LRU per namespace.",
+    ("namespace",),
+)
+
+
+class LRUCache:
+    """In-process LRU cache with a per-entry time to live."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        stats: CacheStats | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheBackend(ABC):
+    """Shared cache backend (e.g. Redis / memcached) storing raw bytes."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local stand-in for a shared backend, used in tests and dev."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: dict[str, tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (self._clock() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class ReadThroughCache(Generic[T]):
+    """
+    Local LRU in front of an optional shared backend in front of a loader.
+
+    Misses (loader returning None) are not cached.
+    Values are serialized only for the shared backend.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local: LRUCache,
+        dumps: Callable[[T], bytes],
+        loads: Callable[[bytes], T],
+        shared: CacheBackend | None = None,
+    ):
+        self.namespace = namespace
+        self.local = local
+        self.shared = shared
+        self.stats = local.stats
+        self._dumps = dumps
+        self._loads = loads
+        # bumped on every invalidation, so a load that raced
+        # with a write never repopulates the cache with stale data
+        self._epoch = 0
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T | None]],
+    ) -> T | None:
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.stats.hits += 1
+            return value
+
+        epoch = self._epoch
+        if self.shared is not None:
+            raw = await self.shared.get(self._shared_key(key))
+            if raw is not None:
+                self.stats.shared_hits += 1
+                value = self._loads(raw)
+                if epoch == self._epoch:
+                    self.local.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        value = await loader()
+        if value is None or epoch != self._epoch:
+            return value
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(
+                self._shared_key(key),
+                self._dumps(value),
+                self.local.ttl,
+            )
+        return value
+
+    async def invalidate(self, key: Hashable) -> None:
+        self._epoch += 1
+        self.stats.invalidations += 1
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(self._shared_key(key))
+
+
+def register_cache_metrics(cache: ReadThroughCache) -> None:
+    # the stats stay plain ints on the hot path, copied in on every scrape
+    def collect() -> None:
+        labels = (cache.namespace,)
+        for name, value in cache.stats.as_dict().items():
+            cache_stat_totals[name].set_total(labels, value)
+        cache_entries.set(labels, len(cache.local))
+
+    registry.on_collect(collect)
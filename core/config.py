@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pydantic import BaseModel
 from pathlib import Path
@@ -7,15 +9,137 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "db.sqlite3"
 
 
+class SqlitePragmas(BaseModel):
+    # applied on every new connection, None skips the pragma
+    journal_mode: str | None = "WAL"
+    synchronous: str | None = "NORMAL"
+    busy_timeout: int | None = 5000
+    mmap_size: int | None = 256 * 1024 * 1024
+    # negative value is a size in KiB
+    cache_size: int | None = -64_000
+    temp_store: str | None = "MEMORY"
+
+
 class DbSettings(BaseModel):
     url: str = f"sqlite+aiosqlite:///{DB_PATH}"
-    # echo: bool = False
-    echo: bool = True
+    echo: bool = False
+    # echo: bool = True
+    # statements slower than this (seconds) go to the "db.slow_query" log
+    slow_query_threshold: float = 0.1
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+    pool_timeout: float = 30.0
+    sqlite_pragmas: SqlitePragmas = SqlitePragmas()
+    # read replicas; reads fall back to `url` when empty or all replicas are down
+    read_urls: list[str] = []
+    read_strategy: Literal["round_robin", "least_busy"] = "round_robin"
+    # seconds a replica that failed its health check is skipped for
+    replica_retry_after: float = 30.0
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    max_size: int = 10_000
+    ttl: float = 60.0
+    # "memory" is the in-process stand-in for a shared backend;
+    # local entries in other workers still live up to `ttl` after a write
+    shared_backend: Literal["none", "memory"] = "none"
+
+
+class PriceFeedSettings(BaseModel):
+    # "memory" only reaches subscribers of the worker that made the change,
+    # "outbox" has every worker tail the outbox table
+    backend: Literal["memory", "outbox"] = "memory"
+    poll_interval: float = 0.5
+    # messages a subscriber may fall behind by before it is dropped
+    queue_size: int = 100
+    max_subscribers: int = 10_000
+    heartbeat_interval: float = 15.0
+
+
+class ProductsSettings(BaseModel):
+    page_size: int = 50
+    max_page_size: int = 500
+    export_chunk_size: int = 1000
+    bulk_batch_size: int = 500
+    bulk_max_items: int = 50_000
+    # list pages as Core rows dumped straight to JSON bytes,
+    # skipping ORM objects and response_model validation
+    fast_serialization: bool = False
+    cache: CacheSettings = CacheSettings()
+    price_feed: PriceFeedSettings = PriceFeedSettings()
+
+
+class OrdersSettings(BaseModel):
+    page_size: int = 50
+    max_page_size: int = 200
+
+
+class SessionSettings(BaseModel):
+    # "sqlite" shares sessions between workers through `sqlite_path`
+    backend: Literal["memory", "sqlite"] = "memory"
+    ttl: float = 60 * 60
+    max_sessions: int = 100_000
+    sqlite_path: Path = BASE_DIR / "sessions.sqlite3"
+    purge_interval: float = 60.0
+
+
+class CredentialsSettings(BaseModel):
+    scrypt_n: int = 2**14
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    hash_executor: Literal["thread", "process"] = "thread"
+    hash_workers: int = 4
+    verify_cache_ttl: float = 60.0
+    verify_cache_max_size: int = 10_000
+
+
+class TokensSettings(BaseModel):
+    # key id -> secret; sign with `active_key_id`, keep old ids to rotate
+    signing_keys: dict[str, str] = {"dev": "change-me-dev-signing-key"}
+    active_key_id: str = "dev"
+    ttl: float = 15 * 60
+    revocation_max_size: int = 100_000
+
+
+class MetricsSettings(BaseModel):
+    # set under multiple workers: each one dumps its metrics there
+    # and /metrics aggregates all of them
+    multiprocess_dir: Path | None = None
+    flush_interval: float = 5.0
+
+
+class OutboxSettings(BaseModel):
+    relay_enabled: bool = True
+    # each sink has its own offset, an empty list only prunes
+    sinks: list[Literal["queue", "file", "webhook"]] = []
+    batch_size: int = 500
+    poll_interval: float = 1.0
+    # a relay that stops renewing its lease is taken over after this
+    lease_ttl: float = 30.0
+    max_backoff: float = 60.0
+    # delivered events are deleted once older than this (seconds)
+    retention: float = 7 * 24 * 60 * 60
+    prune_interval: float = 60.0
+    queue_max_size: int = 10_000
+    file_path: Path = BASE_DIR / "outbox_events.ndjson"
+    webhook_url: str | None = None
+    webhook_headers: dict[str, str] = {}
+    webhook_timeout: float = 5.0
 
 
 class Settings(BaseSettings):
     api_v1_prefix: str = "/api/v1"
     db: DbSettings = DbSettings()
+    products: ProductsSettings = ProductsSettings()
+    orders: OrdersSettings = OrdersSettings()
+    sessions: SessionSettings = SessionSettings()
+    credentials: CredentialsSettings = CredentialsSettings()
+    tokens: TokensSettings = TokensSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    outbox: OutboxSettings = OutboxSettings()
 
 
 settings = Settings()
@@ -0,0 +1,130 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import registry, route_template
+
+slow_query_logger = logging.getLogger("db.slow_query")
+
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while handling one request."""
+
+    scope: Scope = field(default_factory=dict)
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}"
+        )
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats",
+    default=None,
+)
+
+
+db_requests_total = registry.counter(
+    "db_requests_total",
+    "Requests seen per route.",
+    ("route",),
+)
+db_statements_total = registry.counter(
+    "db_statements_total",
+    "SQL statements per route.",
+    ("route",),
+)
+db_time_seconds_total = registry.counter(
+    "db_time_seconds_total",
+    "Time spent in SQL per route.",
+    ("route",),
+)
+db_slowest_statement_seconds = registry.gauge(
+    "db_slowest_statement_seconds",
+    "Slowest statement per route.",
+    ("route",),
+    multiprocess_mode="max",
+)
+
+
+def record_route_query_stats(route: str, stats: QueryStats) -> None:
+    labels = (route,)
+    db_requests_total.inc(labels)
+    db_statements_total.inc(labels, stats.count)
+    db_time_seconds_total.inc(labels, stats.total_time)
+    db_slowest_statement_seconds.set_max(labels, stats.slowest_time)
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_threshold: float) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started_at
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed >= slow_query_threshold:
+            record: dict[str, Any] = {
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": statement,
+                "executemany": executemany,
+                "route": stats and route_template(stats.scope),
+            }
+            slow_query_logger.warning(json.dumps(record))
+
+
+class QueryStatsMiddleware:
+    """Collects per-request SQL stats and reports them in a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    stats.server_timing(),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if template := route_template(scope):
+                record_route_query_stats(template, stats)
@@ -0,0 +1,310 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Every worker records into its own in-process registry. With a
+multiprocess directory configured, workers periodically dump a JSON
+snapshot there and /metrics merges the snapshots of all workers.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Iterable, Literal
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Labels = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def route_template(scope: Scope) -> str | None:
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(
+        f'{name}="{escape_label(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[Labels, Any] = {}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_total(self, labels: Labels, value: float) -> None:
+        # for counters owned elsewhere and copied in at collection time
+        self.values[labels] = value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        multiprocess_mode: Literal["livesum", "max"] = "livesum",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def set_max(self, labels: Labels, value: float) -> None:
+        if value > self.values.get(labels, value - 1):
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    """Values per label set are [count per bucket ..., +Inf count, sum]."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        # non-cumulative counts, made cumulative when rendering
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Labels = (), **kwargs):
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Labels = (), **kwargs
+    ):
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def on_collect(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict[str, Any]:
+        for collector in self.collectors:
+            collector()
+        return {
+            "pid": os.getpid(),
+            "metrics": {
+                name: [[list(labels), value] for labels, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            },
+        }
+
+    def merge(self, snapshots: Iterable[dict[str, Any]]) -> dict[str, dict]:
+        merged: dict[str, dict[Labels, Any]] = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            alive = snapshot.get("alive", True)
+            for name, samples in snapshot["metrics"].items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    if isinstance(metric, Histogram):
+                        current = values.get(labels)
+                        values[labels] = (
+                            list(value)
+                            if current is None
+                            else [a + b for a, b in zip(current, value)]
+                        )
+                    elif isinstance(metric, Gauge):
+                        if metric.multiprocess_mode == "max":
+                            values[labels] = max(values.get(labels, value), value)
+                        elif alive:
+                            values[labels] = values.get(labels, 0) + value
+                    else:
+                        values[labels] = values.get(labels, 0) + value
+        return merged
+
+    def render(self, values: dict[str, dict[Labels, Any]] | None = None) -> str:
+        if values is None:
+            values = self.merge([self.snapshot()])
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in values.get(name, {}).items():
+                if not isinstance(metric, Histogram):
+                    label_text = format_labels(metric.labelnames, labels)
+                    lines.append(f"{name}{label_text} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    label_text = format_labels(
+                        metric.labelnames + ("le",),
+                        labels + (format_value(bound),),
+                    )
+                    lines.append(f"{name}_bucket{label_text} {cumulative}")
+                label_text = format_labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {format_value(value[-1])}")
+                lines.append(f"{name}_count{label_text} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(registry: Registry, directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"metrics_{os.getpid()}.json"
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(registry.snapshot()))
+    os.replace(tmp_path, path)
+
+
+def read_snapshots(directory: Path) -> list[dict[str, Any]]:
+    snapshots = []
+    for path in directory.glob("metrics_*.json"):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        # counters of exited workers still count, their gauges don't
+        snapshot["alive"] = pid_alive(snapshot["pid"])
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def render_metrics(registry: Registry, multiprocess_dir: Path | None) -> str:
+    if multiprocess_dir is None:
+        return registry.render()
+    write_snapshot(registry, multiprocess_dir)
+    return registry.render(registry.merge(read_snapshots(multiprocess_dir)))
+
+
+async def flush_metrics_periodically(
+    registry: Registry,
+    directory: Path,
+    interval: float,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(write_snapshot, registry, directory)
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status class.",
+    ("route", "method", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and method.",
+    ("route", "method"),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """
+    Records request count, status class, in-flight and latency per route.
+
+    Labels use the route template (`/products/{product_id}/`), never the raw
+    path, so cardinality stays bounded by the number of routes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = route_template(scope) or UNMATCHED_ROUTE
+            method = scope["method"]
+            http_requests_total.inc((route, method, f"{status_code // 100}xx"))
+            http_request_duration_seconds.observe(
+                (route, method),
+                time.perf_counter() - started_at,
+            )
@@ -8,6 +8,12 @@ __all__ = (
     "Profile",
     "Order",
     "OrderProductAssociation",
+    "DailyProductSales",
+    "SummaryWatermark",
+    "products_fts",
+    "TableVersion",
+    "OutboxEvent",
+    "OutboxOffset",
 )
 
 from .base import Base
@@ -18,3 +24,8 @@ from .post import Post
 from .profile import Profile
 from .order import Order
 from .order_product_association import OrderProductAssociation
+from .daily_product_sales import DailyProductSales, SummaryWatermark
+from . import order_totals
+from .product_search import products_fts
+from .table_version import TableVersion
+from .outbox import OutboxEvent, OutboxOffset
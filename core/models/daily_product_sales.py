@@ -0,0 +1,33 @@
+from datetime import date
+
+from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class DailyProductSales(Base):
+    """Per day and product sales totals, materialized for closed days."""
+
+    __tablename__ = "daily_product_sales"
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "product_id",
+            name="idx_unique_day_product",
+        ),
+    )
+
+    day: Mapped[date]
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    units: Mapped[int]
+    revenue: Mapped[int]
+
+
+class SummaryWatermark(Base):
+    """Last day a materialized summary table has been refreshed through."""
+
+    __tablename__ = "summary_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), unique=True)
+    through: Mapped[date]
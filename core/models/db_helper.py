@@ -1,21 +1,101 @@
-from typing import Any, AsyncGenerator
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Literal, Sequence
 
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     async_scoped_session,
     AsyncSession,
+    AsyncEngine,
 )
 from asyncio import current_task
 from core.config import settings
+from core.db_instrumentation import instrument_engine
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, Any]) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class ReadReplica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.session_factory = async_sessionmaker(
+            bind=engine, autoflush=False, autocommit=False, expire_on_commit=False
+        )
+        self.in_flight = 0
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    def mark_down(self, retry_after: float) -> None:
+        self.down_until = time.monotonic() + retry_after
+
+    def mark_up(self) -> None:
+        self.down_until = 0.0
 
 
 class DatabaseHelper:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(url=url, echo=echo)
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = False,
+        pool_recycle: int = -1,
+        pool_timeout: float = 30.0,
+        sqlite_pragmas: dict[str, Any] | None = None,
+        read_urls: Sequence[str] = (),
+        read_strategy: Literal["round_robin", "least_busy"] = "round_robin",
+        replica_retry_after: float = 30.0,
+        slow_query_threshold: float | None = None,
+    ):
+        self.echo = echo
+        self.slow_query_threshold = slow_query_threshold
+        self.pool_options: dict[str, Any] = {
+            "pool_pre_ping": pool_pre_ping,
+            "pool_recycle": pool_recycle,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+        }
+        self.sqlite_pragmas = sqlite_pragmas
+        self.engine = self.create_engine(url)
         self.session_factory = async_sessionmaker(
             bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False
         )
+        self.replicas = [ReadReplica(self.create_engine(url)) for url in read_urls]
+        self.read_strategy = read_strategy
+        self.replica_retry_after = replica_retry_after
+        self._round_robin = itertools.count()
+
+    def create_engine(self, url: str) -> AsyncEngine:
+        engine_url = make_url(url)
+        is_sqlite = engine_url.get_backend_name() == "sqlite"
+        engine_options = dict(self.pool_options)
+        # in-memory SQLite runs on a StaticPool, which has no size or overflow
+        if is_sqlite and engine_url.database in (None, "", ":memory:"):
+            for option in ("pool_size", "max_overflow", "pool_timeout"):
+                engine_options.pop(option)
+        engine = create_async_engine(url=url, echo=self.echo, **engine_options)
+        if is_sqlite and self.sqlite_pragmas:
+            set_sqlite_pragmas(engine, self.sqlite_pragmas)
+        if self.slow_query_threshold is not None:
+            instrument_engine(engine, self.slow_query_threshold)
+        return engine
 
     def get_scoped_session(self) -> async_scoped_session:
         session = async_scoped_session(
@@ -34,8 +114,68 @@ class DatabaseHelper:
         yield session
         await session.close()
 
+    def pick_replica(self) -> ReadReplica | None:
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if not candidates:
+            return None
+        if self.read_strategy == "least_busy":
+            return min(candidates, key=lambda replica: replica.in_flight)
+        return candidates[next(self._round_robin) % len(candidates)]
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        replica = self.pick_replica()
+        if replica is None:
+            async with self.session_factory() as session:
+                yield session
+            return
+
+        replica.in_flight += 1
+        try:
+            session = replica.session_factory()
+            try:
+                # checking out a connection doubles as the health check
+                await session.connection()
+            except (DBAPIError, OSError):
+                await session.close()
+                replica.mark_down(self.replica_retry_after)
+                session = self.session_factory()
+            async with session:
+                yield session
+        finally:
+            replica.in_flight -= 1
+
+    async def read_session_dependency(self) -> AsyncGenerator[Any, Any]:
+        async with self.read_session() as session:
+            yield session
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except (DBAPIError, OSError):
+                replica.mark_down(self.replica_retry_after)
+            else:
+                replica.mark_up()
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
 
 db_helper = DatabaseHelper(
     url=settings.db.url,
     echo=settings.db.echo,
+    pool_size=settings.db.pool_size,
+    max_overflow=settings.db.max_overflow,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    pool_recycle=settings.db.pool_recycle,
+    pool_timeout=settings.db.pool_timeout,
+    sqlite_pragmas=settings.db.sqlite_pragmas.model_dump(exclude_none=True),
+    read_urls=settings.db.read_urls,
+    read_strategy=settings.db.read_strategy,
+    replica_retry_after=settings.db.replica_retry_after,
+    slow_query_threshold=settings.db.slow_query_threshold,
 )
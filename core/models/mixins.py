@@ -19,6 +19,8 @@ class UserRelationMixin:
             ForeignKey("users.id"),
             unique=cls._user_id_unique,
             nullable=cls._user_id_nullable,
+            # a unique constraint already comes with an index
+            index=not cls._user_id_unique,
         )
 
     @declared_attr
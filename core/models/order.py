@@ -16,8 +16,10 @@ class Order(Base):
     created_at: Mapped[datetime] = mapped_column(
         server_default=func.now(),
         default=datetime.now,
+        index=True,
     )
-    price: Mapped[int | None]
+    # kept in sync with the order lines, see order_totals
+    price: Mapped[int | None] = mapped_column(default=0)
     # products: Mapped[list["Product"]] = relationship(
     #     secondary="order_product_association",
     #     back_populates="orders",
@@ -22,8 +22,11 @@ class OrderProductAssociation(Base):
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"))
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    # the old value is loaded before it's replaced, even when expired,
+    # so order_totals recomputes the order a line was moved away from
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), active_history=True)
+    # (order_id, product_id) covers lookups by order, this one by product
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
     count: Mapped[int] = mapped_column(default=1, server_default="1")
     unit_price: Mapped[int] = mapped_column(default=0, server_default="0")
 
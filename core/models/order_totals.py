@@ -0,0 +1,66 @@
+from itertools import chain
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.orm.util import identity_key
+
+from .order import Order
+from .order_product_association import OrderProductAssociation
+
+
+def order_total_subquery():
+    return (
+        select(
+            func.coalesce(
+                func.sum(
+                    OrderProductAssociation.count * OrderProductAssociation.unit_price
+                ),
+                0,
+            )
+        )
+        .where(OrderProductAssociation.order_id == Order.id)
+        .scalar_subquery()
+    )
+
+
+def affected_order_ids(session: Session) -> set[int]:
+    order_ids: set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, OrderProductAssociation):
+            continue
+        # a line moved between orders changes both totals
+        history = attributes.get_history(obj, "order_id")
+        order_ids.update(history.sum())
+        if obj.order_id is not None:
+            order_ids.add(obj.order_id)
+    order_ids.discard(None)
+    return order_ids
+
+
+@event.listens_for(Session, "after_flush")
+def refresh_order_totals(session: Session, flush_context) -> None:
+    """
+    Keep Order.price equal to sum(count * unit_price) of its lines.
+
+    Runs one UPDATE per flush for all touched orders.
+    """
+    order_ids = affected_order_ids(session)
+    if not order_ids:
+        return
+
+    result = session.connection().execute(
+        update(Order)
+        .where(Order.id.in_(order_ids))
+        .values(price=order_total_subquery())
+        .returning(Order.id, Order.price)
+    )
+    session.info.setdefault("order_totals", {}).update(result.tuples().all())
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def sync_order_totals(session: Session, flush_context) -> None:
+    # instance state can only be changed once the flush has finished
+    for order_id, price in session.info.pop("order_totals", {}).items():
+        order = session.identity_map.get(identity_key(Order, order_id))
+        if order is not None:
+            attributes.set_committed_value(order, "price", price)
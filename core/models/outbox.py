@@ -0,0 +1,42 @@
+"""
+Transactional outbox.
+
+Change events are inserted in the same transaction as the change itself,
+a relay (see core.outbox) publishes them afterwards. Ids only ever grow,
+so a sink's position in the stream is the last event id it received.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    # AUTOINCREMENT: ids of pruned events are never handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    type: Mapped[str] = mapped_column(String(64))
+    aggregate: Mapped[str] = mapped_column(String(32))
+    aggregate_id: Mapped[int]
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        default=datetime.now,
+    )
+
+
+class OutboxOffset(Base):
+    """Last event id delivered to a sink, and which relay may deliver to it."""
+
+    __tablename__ = "outbox_offsets"
+
+    sink: Mapped[str] = mapped_column(String(64), unique=True)
+    position: Mapped[int] = mapped_column(default=0, server_default="0")
+    # one relay per sink at a time, the lease is renewed every batch
+    owner: Mapped[str | None] = mapped_column(String(64))
+    lease_expires: Mapped[float] = mapped_column(default=0, server_default="0")
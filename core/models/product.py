@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 from .base import Base
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
 if TYPE_CHECKING:
@@ -12,6 +12,8 @@ class Product(Base):
     name: Mapped[str]
     description: Mapped[str]
     price: Mapped[int]
+    # bumped on every update, the ETag of the product
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
     # orders: Mapped[list["Order"]] = relationship(
     #     secondary="order_product_association",
     #     back_populates="products",
@@ -19,3 +21,6 @@ class Product(Base):
     orders_details: Mapped[list["OrderProductAssociation"]] = relationship(
         back_populates="product",
     )
+
+    # ORM flushes check and bump the version, a stale write raises StaleDataError
+    __mapper_args__ = {"version_id_col": version}
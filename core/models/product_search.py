@@ -0,0 +1,78 @@
+"""
+Full-text index over product names and descriptions (SQLite FTS5).
+
+`products_fts` is an external-content table: it stores only the index and
+reads the text back from `products`. Triggers keep it in sync, so Core
+bulk statements are covered as well as the ORM. The alembic migration
+that creates it on existing databases issues the same statements.
+"""
+
+from sqlalchemy import DDL, column, event, table
+
+from .product import Product
+
+PRODUCTS_FTS = "products_fts"
+
+# name matches weigh more than description matches in the bm25 rank
+CREATE_PRODUCTS_FTS = (
+    f"""
+    CREATE VIRTUAL TABLE {PRODUCTS_FTS} USING fts5(
+        name,
+        description,
+        content='products',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"INSERT INTO {PRODUCTS_FTS}({PRODUCTS_FTS}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    f"""
+    CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO {PRODUCTS_FTS}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO {PRODUCTS_FTS}({PRODUCTS_FTS}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # price updates don't touch the index
+    f"""
+    CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description ON products
+    BEGIN
+        INSERT INTO {PRODUCTS_FTS}({PRODUCTS_FTS}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {PRODUCTS_FTS}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+DROP_PRODUCTS_FTS = (
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    f"DROP TABLE IF EXISTS {PRODUCTS_FTS}",
+)
+
+# not part of Base.metadata, so create_all and autogenerate leave it alone
+products_fts = table(
+    PRODUCTS_FTS,
+    column("rowid"),
+    column("rank"),
+    column(PRODUCTS_FTS),
+)
+
+for statement in CREATE_PRODUCTS_FTS:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in DROP_PRODUCTS_FTS:
+    event.listen(
+        Product.__table__,
+        "before_drop",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
@@ -0,0 +1,48 @@
+"""
+Per table change counters, bumped by triggers on every row written.
+
+A list endpoint can tell whether anything changed with a single primary
+key read, before running its query.
+"""
+
+from sqlalchemy import DDL, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# tables with a change counter
+VERSIONED_TABLES = ("products",)
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(64), unique=True)
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+def table_version_ddl(table_name: str) -> list[str]:
+    bump = (
+        f"UPDATE table_versions SET version = version + 1 "
+        f"WHERE name = '{table_name}';"
+    )
+    return [
+        f"INSERT OR IGNORE INTO table_versions (name, version) "
+        f"VALUES ('{table_name}', 0)",
+        *(
+            f"CREATE TRIGGER IF NOT EXISTS {table_name}_version_{operation.lower()} "
+            f"AFTER {operation} ON {table_name} BEGIN {bump} END"
+            for operation in ("INSERT", "UPDATE", "DELETE")
+        ),
+    ]
+
+
+# on the metadata, so the versioned tables exist by then; that fires on
+# every create_all, hence IF NOT EXISTS / OR IGNORE
+for table_name in VERSIONED_TABLES:
+    for statement in table_version_ddl(table_name):
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(statement).execute_if(dialect="sqlite"),
+        )
@@ -0,0 +1,377 @@
+"""
+Outbox relay: publishes committed change events to sinks.
+
+Writers only insert OutboxEvent rows in their own transaction (see
+`add_event`). The relay reads them in id order and hands batches to each
+sink; a sink's offset is advanced only after its batch was accepted, so
+delivery is at-least-once and consumers dedupe by event id. Offsets live
+in the database: a restarted relay resumes where the last one stopped,
+and a lease on each offset keeps workers from publishing the same sink
+concurrently.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Sequence
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import OutboxSettings
+from .metrics import registry
+from .models import DatabaseHelper, OutboxEvent, OutboxOffset
+
+log = logging.getLogger("outbox")
+
+Event = dict[str, Any]
+
+outbox_events_published_total = registry.counter(
+    "outbox_events_published_total",
+    "Outbox events accepted by a sink, redeliveries included.",
+    ("sink",),
+)
+outbox_publish_failures_total = registry.counter(
+    "outbox_publish_failures_total",
+    "Outbox batches a sink failed to accept, retried with backoff.",
+    ("sink",),
+)
+outbox_sink_position = registry.gauge(
+    "outbox_sink_position",
+    "Id of the last outbox event delivered to a sink.",
+    ("sink",),
+    multiprocess_mode="max",
+)
+
+
+def add_event(
+    session: AsyncSession,
+    type: str,
+    aggregate: str,
+    aggregate_id: int,
+    payload: dict[str, Any],
+) -> None:
+    # flushed and committed together with the change it describes
+    session.add(
+        OutboxEvent(
+            type=type,
+            aggregate=aggregate,
+            aggregate_id=aggregate_id,
+            payload=payload,
+        )
+    )
+
+
+async def add_events(session: AsyncSession, events: Sequence[dict[str, Any]]) -> None:
+    # for bulk writes: one executemany instead of an ORM object per event
+    if events:
+        await session.execute(insert(OutboxEvent), list(events))
+
+
+def envelope(event: OutboxEvent) -> Event:
+    return {
+        "id": event.id,
+        "type": event.type,
+        "aggregate": event.aggregate,
+        "aggregate_id": event.aggregate_id,
+        "created_at": event.created_at.isoformat(),
+        "payload": event.payload,
+    }
+
+
+class EventSink(ABC):
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    async def publish(self, events: Sequence[Event]) -> None:
+        """Accept the whole batch or raise, a failed batch is sent again."""
+
+
+class QueueSink(EventSink):
+    """
+    Hands events to consumers in this process.
+
+    `publish` waits while the queue is full, so a slow consumer holds back
+    its sink only. With several workers the events go to whichever worker
+    holds the lease.
+    """
+
+    def __init__(self, name: str = "queue", max_size: int = 10_000):
+        super().__init__(name)
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=max_size)
+
+    async def publish(self, events: Sequence[Event]) -> None:
+        for event in events:
+            await self.queue.put(event)
+
+
+class FileSink(EventSink):
+    """Appends events to a file as NDJSON, fsynced per batch."""
+
+    def __init__(self, path: Path, name: str = "file"):
+        super().__init__(name)
+        self.path = path
+
+    def write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    async def publish(self, events: Sequence[Event]) -> None:
+        lines = "".join(json.dumps(event) + "\n" for event in events)
+        await asyncio.to_thread(self.write, lines)
+
+
+class WebhookSink(EventSink):
+    """
+    POSTs each batch as {"events": [...]}; any non-2xx response fails it.
+
+    Idempotency-Key is the batch's id range; a retried batch may hold more
+    events than the failed one, so receivers should dedupe by event id.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float,
+        headers: dict[str, str] | None = None,
+        name: str = "webhook",
+    ):
+        super().__init__(name)
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def post(self, body: bytes, idempotency_key: str) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            method="POST",
+            headers={
+                **self.headers,
+                "Content-Type": "application/json",
+                "Idempotency-Key": idempotency_key,
+            },
+        )
+        # raises HTTPError for 4xx/5xx
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def publish(self, events: Sequence[Event]) -> None:
+        body = json.dumps({"events": list(events)}).encode("utf-8")
+        idempotency_key = f"{events[0]['id']}-{events[-1]['id']}"
+        await asyncio.to_thread(self.post, body, idempotency_key)
+
+
+def make_sinks(outbox: OutboxSettings) -> list[EventSink]:
+    sinks: list[EventSink] = []
+    for name in outbox.sinks:
+        if name == "queue":
+            sinks.append(QueueSink(max_size=outbox.queue_max_size))
+        elif name == "file":
+            sinks.append(FileSink(outbox.file_path))
+        elif name == "webhook":
+            if outbox.webhook_url is None:
+                raise ValueError("outbox webhook sink needs outbox.webhook_url")
+            sinks.append(
+                WebhookSink(
+                    url=outbox.webhook_url,
+                    timeout=outbox.webhook_timeout,
+                    headers=outbox.webhook_headers,
+                )
+            )
+    return sinks
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        db: DatabaseHelper,
+        sinks: Sequence[EventSink],
+        batch_size: int,
+        poll_interval: float,
+        lease_ttl: float,
+        max_backoff: float,
+        retention: float,
+        prune_interval: float,
+        owner: str | None = None,
+    ):
+        self.db = db
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.max_backoff = max_backoff
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.owner = (
+            owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+
+    async def ensure_offset(self, sink: EventSink) -> None:
+        async with self.db.session_factory() as session:
+            exists = await session.scalar(
+                select(OutboxOffset.id).where(OutboxOffset.sink == sink.name),
+            )
+            if exists is not None:
+                return
+            session.add(OutboxOffset(sink=sink.name))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # another relay created it first
+                await session.rollback()
+
+    async def acquire(self, session: AsyncSession, sink: EventSink) -> int | None:
+        """Take or renew the sink's lease, returns its position if held."""
+        now = time.time()
+        position = await session.scalar(
+            update(OutboxOffset)
+            .where(
+                OutboxOffset.sink == sink.name,
+                or_(
+                    OutboxOffset.owner == self.owner,
+                    OutboxOffset.lease_expires < now,
+                ),
+            )
+            .values(owner=self.owner, lease_expires=now + self.lease_ttl)
+            .returning(OutboxOffset.position),
+        )
+        await session.commit()
+        return position
+
+    async def deliver_batch(self, sink: EventSink) -> int:
+        """Publish the sink's next batch, returns the number of events in it."""
+        async with self.db.session_factory() as session:
+            position = await self.acquire(session, sink)
+            if position is None:
+                # another relay holds the lease
+                return 0
+            events = await session.scalars(
+                select(OutboxEvent)
+                .where(OutboxEvent.id > position)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size),
+            )
+            batch = [envelope(event) for event in events]
+            # no transaction stays open while the sink takes its time
+            await session.commit()
+            if not batch:
+                return 0
+
+            await sink.publish(batch)
+
+            last_id = batch[-1]["id"]
+            # only if nobody took over meanwhile, a relay that did
+            # redelivers from `position`
+            await session.execute(
+                update(OutboxOffset)
+                .where(
+                    OutboxOffset.sink == sink.name,
+                    OutboxOffset.owner == self.owner,
+                    OutboxOffset.position == position,
+                )
+                .values(position=last_id, lease_expires=time.time() + self.lease_ttl),
+            )
+            await session.commit()
+        outbox_events_published_total.inc((sink.name,), len(batch))
+        outbox_sink_position.set_max((sink.name,), last_id)
+        return len(batch)
+
+    async def run_sink(self, sink: EventSink) -> None:
+        ready = False
+        backoff = 0.0
+        while True:
+            try:
+                if not ready:
+                    await self.ensure_offset(sink)
+                    ready = True
+                delivered = await self.deliver_batch(sink)
+            except Exception as exc:
+                outbox_publish_failures_total.inc((sink.name,))
+                backoff = min(max(backoff * 2, self.poll_interval), self.max_backoff)
+                log.warning(
+                    "outbox sink %s failed, retrying in %.1fs: %r",
+                    sink.name,
+                    backoff,
+                    exc,
+                )
+                await asyncio.sleep(backoff)
+                continue
+            backoff = 0.0
+            # a full batch means there is probably more waiting
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def prune(self) -> int:
+        """Delete events every sink has received and older than `retention`."""
+        cutoff = datetime.now() - timedelta(seconds=self.retention)
+        async with self.db.session_factory() as session:
+            statement = delete(OutboxEvent).where(OutboxEvent.created_at < cutoff)
+            if self.sinks:
+                offsets, delivered = (
+                    await session.execute(
+                        select(
+                            func.count(OutboxOffset.id),
+                            func.min(OutboxOffset.position),
+                        ).where(OutboxOffset.sink.in_(self.sinks)),
+                    )
+                ).one()
+                if offsets < len(self.sinks):
+                    # a sink without an offset hasn't received anything yet
+                    return 0
+                statement = statement.where(OutboxEvent.id <= delivered)
+            result = await session.execute(statement)
+            await session.commit()
+        return result.rowcount
+
+    async def prune_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                await self.prune()
+            except Exception:
+                log.exception("outbox prune failed")
+
+    async def release(self) -> None:
+        # lets another relay take over right away instead of after lease_ttl
+        async with self.db.session_factory() as session:
+            await session.execute(
+                update(OutboxOffset)
+                .where(OutboxOffset.owner == self.owner)
+                .values(owner=None, lease_expires=0),
+            )
+            await session.commit()
+
+    async def run(self) -> None:
+        try:
+            await asyncio.gather(
+                *(self.run_sink(sink) for sink in self.sinks.values()),
+                self.prune_periodically(),
+            )
+        finally:
+            await self.release()
+
+
+def make_relay(outbox: OutboxSettings, db: DatabaseHelper) -> OutboxRelay:
+    return OutboxRelay(
+        db=db,
+        sinks=make_sinks(outbox),
+        batch_size=outbox.batch_size,
+        poll_interval=outbox.poll_interval,
+        lease_ttl=outbox.lease_ttl,
+        max_backoff=outbox.max_backoff,
+        retention=outbox.retention,
+        prune_interval=outbox.prune_interval,
+    )
@@ -0,0 +1,183 @@
+"""
+Pub/sub between workers and fan-out to local subscribers.
+
+A PubSubBackend carries messages between workers; each worker runs one
+Broker that consumes the backend and fans every message out to its own
+subscribers (e.g. open SSE / WebSocket connections), so the backend sees
+one subscription per worker however many clients are connected.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator
+
+from sqlalchemy import func, select
+
+from .metrics import registry
+from .models import DatabaseHelper, OutboxEvent
+
+log = logging.getLogger("pubsub")
+
+Message = dict[str, Any]
+
+broker_subscribers = registry.gauge(
+    "broker_subscribers",
+    "Connected subscribers per broker.",
+    ("broker",),
+)
+broker_messages_total = registry.counter(
+    "broker_messages_total",
+    "Messages fanned out per broker.",
+    ("broker",),
+)
+broker_dropped_subscribers_total = registry.counter(
+    "broker_dropped_subscribers_total",
+    "Subscribers dropped because their queue was full.",
+    ("broker",),
+)
+
+
+class PubSubBackend(ABC):
+    @abstractmethod
+    async def publish(self, channel: str, message: Message) -> None: ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[Message]: ...
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Delivers only within this process, enough for a single worker."""
+
+    def __init__(self):
+        self._queues: dict[str, set[asyncio.Queue[Message]]] = {}
+
+    async def publish(self, channel: str, message: Message) -> None:
+        for queue in self._queues.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Message]:
+        queue: asyncio.Queue[Message] = asyncio.Queue()
+        self._queues.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues[channel].discard(queue)
+
+
+class OutboxPubSub(PubSubBackend):
+    """
+    Every worker tails outbox_events itself, channels are event types.
+
+    The events are written by the transactions that made the changes
+    (see core.outbox), so there is nothing left to publish and only
+    committed changes are ever seen. Messages are the event payloads.
+    """
+
+    def __init__(self, db: DatabaseHelper, poll_interval: float):
+        self.db = db
+        self.poll_interval = poll_interval
+
+    async def publish(self, channel: str, message: Message) -> None:
+        pass
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Message]:
+        last_id: int | None = None
+        while True:
+            try:
+                async with self.db.session_factory() as session:
+                    # bounded first, so events of other types are never
+                    # scanned twice
+                    upper = await session.scalar(select(func.max(OutboxEvent.id)))
+                    if last_id is None:
+                        # only what happens from now on
+                        payloads = []
+                    else:
+                        result = await session.scalars(
+                            select(OutboxEvent.payload)
+                            .where(
+                                OutboxEvent.id > last_id,
+                                OutboxEvent.id <= upper,
+                                OutboxEvent.type == channel,
+                            )
+                            .order_by(OutboxEvent.id),
+                        )
+                        payloads = result.all()
+                    last_id = upper or 0
+            except Exception as exc:
+                log.warning("outbox subscription %s failed: %r", channel, exc)
+            else:
+                for payload in payloads:
+                    yield payload
+            await asyncio.sleep(self.poll_interval)
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+DROPPED = object()
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self, timeout: float) -> str | None:
+        """Next message, None if nothing came within `timeout`."""
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is DROPPED:
+            raise SlowConsumer
+        return message
+
+
+class Broker:
+    """
+    Fans messages out to local subscribers through bounded queues.
+
+    Messages are rendered once and shared by every subscriber. Publishing
+    never waits: a subscriber whose queue is full is dropped instead of
+    holding back everyone else, it is expected to reconnect and refetch.
+    """
+
+    def __init__(self, name: str, queue_size: int, max_subscribers: int):
+        self.name = name
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscriber]:
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        broker_subscribers.inc((self.name,))
+        try:
+            yield subscriber
+        finally:
+            self.subscribers.discard(subscriber)
+            broker_subscribers.dec((self.name,))
+
+    def drop(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+        # what it hasn't read is lost anyway, make room for the marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(DROPPED)
+        broker_dropped_subscribers_total.inc((self.name,))
+
+    def publish(self, message: str) -> None:
+        broker_messages_total.inc((self.name,))
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.drop(subscriber)
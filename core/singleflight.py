@@ -0,0 +1,81 @@
+"""
+Request coalescing: concurrent identical reads share one in-flight call.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from .metrics import registry
+
+T = TypeVar("T")
+
+singleflight_calls_total = registry.counter(
+    "singleflight_calls_total",
+    "Single-flight calls by group; role is leader (ran the query) or coalesced.",
+    ("group", "role"),
+)
+singleflight_cancelled_total = registry.counter(
+    "singleflight_cancelled_total",
+    "Shared calls cancelled because every waiter went away.",
+    ("group",),
+)
+
+
+class Flight(Generic[T]):
+    def __init__(self, task: asyncio.Task[T]):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Concurrent calls with the same key share one in-flight call.
+
+    The call runs in its own task, so `fn` must not borrow anything owned
+    by the caller (e.g. its request's session). A waiter being cancelled
+    doesn't cancel the call for the others; the call is only cancelled
+    once nobody waits for it. Results and errors are not kept: the key is
+    released as soon as the call finishes.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: dict[Hashable, Flight[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def _release(self, key: Hashable, flight: Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _on_done(self, key: Hashable, flight: Flight[T]) -> None:
+        self._release(key, flight)
+        # nobody may be left to see the error
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._on_done(key, flight))
+            singleflight_calls_total.inc((self.group, "leader"))
+        else:
+            singleflight_calls_total.inc((self.group, "coalesced"))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                singleflight_cancelled_total.inc((self.group,))
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def forget(self, key: Hashable) -> None:
+        """Calls from now on start a new flight, e.g. after the data changed."""
+        # the old call still finishes for whoever already waits on it
+        self._flights.pop(key, None)
@@ -1,23 +1,69 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 import uvicorn
 
 from core.config import settings
+from core.db_instrumentation import QueryStatsMiddleware
+from core.metrics import (
+    PrometheusMiddleware,
+    flush_metrics_periodically,
+    registry,
+    write_snapshot,
+)
+from core.models import db_helper
+from core.outbox import make_relay
 from api_v1 import router as router_v1
+from api_v1.products.price_feed import run_price_feed
+from api_v1.demo_auth.session_store import purge_sessions_periodically
+from api_v1.demo_auth.views import session_store
 from items_views import router as items_router
+from metrics_views import router as metrics_router
 from users.views import router as users_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    purge_sessions = asyncio.create_task(
+        purge_sessions_periodically(
+            store=session_store,
+            interval=settings.sessions.purge_interval,
+        )
+    )
+    background_tasks = [purge_sessions, asyncio.create_task(run_price_feed())]
+    if metrics_dir := settings.metrics.multiprocess_dir:
+        background_tasks.append(
+            asyncio.create_task(
+                flush_metrics_periodically(
+                    registry=registry,
+                    directory=metrics_dir,
+                    interval=settings.metrics.flush_interval,
+                )
+            )
+        )
+    if settings.outbox.relay_enabled:
+        # queue sink consumers find it as app.state.outbox_relay.sinks["queue"]
+        app.state.outbox_relay = make_relay(settings.outbox, db_helper)
+        background_tasks.append(asyncio.create_task(app.state.outbox_relay.run()))
     yield
+    for task in background_tasks:
+        task.cancel()
+    # the outbox relay still releases its leases on the way out
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    if metrics_dir:
+        # counters of this worker keep counting after it exits
+        write_snapshot(registry, metrics_dir)
+    await db_helper.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(PrometheusMiddleware)
 app.include_router(router_v1, prefix=settings.api_v1_prefix)
 app.include_router(items_router)
 app.include_router(users_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.metrics import registry, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(
+        render_metrics(registry, settings.metrics.multiprocess_dir),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,29 @@
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# before anything reads the settings: a throwaway database per test run
+DB_PATH = Path(tempfile.mkdtemp()) / "test.sqlite3"
+os.environ["DB"] = json.dumps({"url": f"sqlite+aiosqlite:///{DB_PATH}"})
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.models import Base, db_helper  # noqa: E402
+from main import app  # noqa: E402
+
+
+async def create_schema() -> None:
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    await db_helper.dispose()
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    asyncio.run(create_schema())
+    # no lifespan: its background tasks would issue statements of their own
+    return TestClient(app)
@@ -0,0 +1,58 @@
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from core.models import Order, OrderProductAssociation, Product, db_helper
+
+
+@pytest.fixture
+def session(client) -> Iterator[Session]:
+    # the listeners are on every Session, a sync one is enough
+    engine = create_engine(db_helper.engine.url.set(drivername="sqlite"))
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def order_with_line(session: Session) -> tuple[Order, OrderProductAssociation]:
+    product = Product(name="line product", description="", price=50)
+    order = Order()
+    session.add_all([product, order])
+    session.flush()
+    line = OrderProductAssociation(
+        order_id=order.id, product_id=product.id, count=1, unit_price=50
+    )
+    session.add(line)
+    session.commit()
+    return order, line
+
+
+def stored_prices(session: Session, *orders: Order) -> list[int]:
+    return [
+        session.scalar(select(Order.price).where(Order.id == order.id))
+        for order in orders
+    ]
+
+
+def test_moving_an_expired_line_recomputes_both_orders(session):
+    first, line = order_with_line(session)
+    second = Order()
+    session.add(second)
+    session.commit()
+
+    # expired by the commit, the old order id is not loaded yet
+    line.order_id = second.id
+    session.commit()
+
+    assert stored_prices(session, first, second) == [0, 50]
+
+
+def test_deleting_an_expired_line_recomputes_its_order(session):
+    order, line = order_with_line(session)
+
+    session.delete(line)
+    session.commit()
+
+    assert stored_prices(session, order) == [0]
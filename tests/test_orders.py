@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from core.models import db_helper
+
+ORDERS = "/api/v1/orders/"
+
+
+@contextmanager
+def count_statements() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db_helper.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="module")
+def product_ids(client: TestClient) -> list[int]:
+    response = client.post(
+        "/api/v1/products/bulk/",
+        json=[
+            {"name": f"product {i}", "description": "", "price": 10 + i}
+            for i in range(8)
+        ],
+    )
+    assert response.status_code == 201
+    return [product["id"] for product in response.json()["items"]]
+
+
+def create_order(client: TestClient, product_ids: list[int]) -> tuple[dict, int]:
+    with count_statements() as statements:
+        response = client.post(
+            ORDERS,
+            json={"products": [{"product_id": id, "count": 2} for id in product_ids]},
+        )
+    assert response.status_code == 201
+    return response.json(), len(statements)
+
+
+def test_create_statement_count_does_not_depend_on_lines(client, product_ids):
+    one_line, one_line_count = create_order(client, product_ids[:1])
+    many_lines, many_lines_count = create_order(client, product_ids)
+
+    assert len(one_line["products_details"]) == 1
+    assert len(many_lines["products_details"]) == len(product_ids)
+    assert many_lines_count == one_line_count
+
+
+def test_get_statement_count_does_not_depend_on_lines(client, product_ids):
+    counts = []
+    for lines in (product_ids[:1], product_ids):
+        order, _ = create_order(client, lines)
+        with count_statements() as statements:
+            response = client.get(f"{ORDERS}{order['id']}/")
+        assert response.status_code == 200
+        assert len(response.json()["products_details"]) == len(lines)
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_list_statement_count_does_not_depend_on_orders_or_lines(client, product_ids):
+    for _ in range(3):
+        create_order(client, product_ids)
+
+    counts = []
+    for limit in (1, 3):
+        with count_statements() as statements:
+            response = client.get(ORDERS, params={"limit": limit})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == limit
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+
+PRODUCTS = "/api/v1/products/"
+
+
+def create_products(client: TestClient, count: int) -> list[dict]:
+    response = client.post(
+        f"{PRODUCTS}bulk/",
+        json=[
+            {"name": f"bulk {i}", "description": "", "price": 10 + i}
+            for i in range(count)
+        ],
+    )
+    assert response.status_code == 201
+    return response.json()["items"]
+
+
+def test_bulk_update_reports_repeated_ids(client):
+    first, second = create_products(client, 2)
+
+    response = client.patch(
+        f"{PRODUCTS}bulk/",
+        json=[
+            {"id": first["id"], "price": 1},
+            {"id": second["id"], "price": 2},
+            {"id": first["id"], "price": 3},
+        ],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(item["id"], item["price"]) for item in body["items"]] == [
+        (first["id"], 1),
+        (second["id"], 2),
+    ]
+    assert body["errors"] == [
+        {
+            "index": 2,
+            "id": first["id"],
+            "detail": f"Product {first['id']} appears more than once",
+        }
+    ]
+
+
+def test_bulk_delete_reports_repeated_ids(client):
+    (product,) = create_products(client, 1)
+    missing = product["id"] + 1000
+
+    response = client.request(
+        "DELETE",
+        f"{PRODUCTS}bulk/",
+        json=[product["id"], missing, product["id"]],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "deleted": [product["id"]],
+        "errors": [
+            {
+                "index": 1,
+                "id": missing,
+                "detail": f"Product {missing} not found",
+            },
+            {
+                "index": 2,
+                "id": product["id"],
+                "detail": f"Product {product['id']} appears more than once",
+            },
+        ],
+    }
+
+
+def test_partial_update_rejects_null_fields(client):
+    (product,) = create_products(client, 1)
+    etag = client.get(f"{PRODUCTS}{product['id']}/").headers["ETag"]
+
+    response = client.patch(
+        f"{PRODUCTS}{product['id']}/",
+        json={"name": None, "price": 5},
+        headers={"If-Match": etag},
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Fields may not be null: name"}
+    assert client.get(f"{PRODUCTS}{product['id']}/").json()["price"] == product["price"]
@@ -0,0 +1,275 @@
+"""
+Flag full table scans in the query plans of the app's queries.
+
+    python -m tools.index_advisor
+    python -m tools.index_advisor --url sqlite:///seeded.sqlite3
+
+Every query below mirrors one issued by crud.py or the api_v1 crud
+modules. They run through the ORM against a small in-memory database
+built from the models, so relationship loaders emit their follow-up
+queries too. Each captured statement then goes through EXPLAIN QUERY
+PLAN, against the same database or against --url. A SCAN of a table, or
+an automatic index SQLite builds because a real one is missing, is
+reported. The exit status is 1 unless the only scans are on tables a
+query reads in full by design (`full_scan_ok`).
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import (
+    CursorResult,
+    Engine,
+    create_engine,
+    delete,
+    event,
+    select,
+    update,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from api_v1.analytics.crud import live_daily_sales
+from api_v1.orders.crud import select_orders_with_lines
+from api_v1.products.crud import match_expression, select_matching_products
+from core.models import (
+    Base,
+    Order,
+    OrderProductAssociation,
+    Post,
+    Product,
+    Profile,
+    User,
+)
+
+SCAN = re.compile(r"^SCAN (\w+)")
+ALIAS_SUFFIX = re.compile(r"_\d+$")
+
+
+@dataclass
+class Query:
+    name: str
+    source: str
+    build: Callable[[], Any]
+    # tables the query is meant to read in full, e.g. listing every user
+    full_scan_ok: tuple[str, ...] = ()
+
+
+TODAY = date.today()
+
+QUERIES = (
+    Query(
+        "get_user_by_username",
+        "crud.py",
+        lambda: select(User).where(User.username == "john"),
+    ),
+    Query(
+        "show_users_with_profiles",
+        "crud.py",
+        lambda: select(User).options(selectinload(User.profile)).order_by(User.id),
+        full_scan_ok=("users",),
+    ),
+    Query(
+        "get_users_with_posts",
+        "crud.py",
+        lambda: select(User).options(joinedload(User.posts)).order_by(User.id),
+        full_scan_ok=("users",),
+    ),
+    Query(
+        "get_users_with_posts_and_profiles",
+        "crud.py",
+        lambda: select(User)
+        .options(joinedload(User.profile), selectinload(User.posts))
+        .order_by(User.id),
+        full_scan_ok=("users",),
+    ),
+    Query(
+        "get_posts_with_authors",
+        "crud.py",
+        lambda: select(Post).options(joinedload(Post.user)).order_by(Post.id),
+        full_scan_ok=("posts",),
+    ),
+    Query(
+        "get_profiles_with_users_and_users_with_posts",
+        "crud.py",
+        lambda: select(Profile)
+        .join(Profile.user)
+        .options(joinedload(Profile.user).selectinload(User.posts))
+        .where(User.username == "john")
+        .order_by(Profile.id),
+    ),
+    Query(
+        "get_orders_with_products_with_assoc",
+        "crud.py",
+        lambda: select_orders_with_lines().order_by(Order.id),
+        full_scan_ok=("orders",),
+    ),
+    Query(
+        "get_products",
+        "api_v1/products/crud.py",
+        lambda: select(Product).where(Product.id > 1).order_by(Product.id).limit(50),
+    ),
+    Query(
+        "get_product",
+        "api_v1/products/crud.py",
+        lambda: select(Product).where(Product.id == 1),
+    ),
+    Query(
+        "search_products",
+        "api_v1/products/crud.py",
+        lambda: select_matching_products(match_expression("mouse")).limit(50),
+    ),
+    Query(
+        "stream_products",
+        "api_v1/products/crud.py",
+        lambda: select(
+            Product.id, Product.name, Product.description, Product.price
+        ).order_by(Product.id),
+        full_scan_ok=("products",),
+    ),
+    Query(
+        "update_products",
+        "api_v1/products/crud.py",
+        lambda: update(Product).where(Product.id.in_([1, 2])).values(price=1),
+    ),
+    Query(
+        "delete_products",
+        "api_v1/products/crud.py",
+        lambda: delete(Product).where(Product.id.in_([1, 2])).returning(Product.id),
+    ),
+    Query(
+        "get_order",
+        "api_v1/orders/crud.py",
+        lambda: select_orders_with_lines().where(Order.id == 1),
+    ),
+    Query(
+        "orders_containing_product",
+        "reverse lookup",
+        lambda: select(OrderProductAssociation.order_id).where(
+            OrderProductAssociation.product_id == 1
+        ),
+    ),
+    Query(
+        "orders_created_between",
+        "date range scan",
+        lambda: select(Order.id).where(
+            Order.created_at >= datetime.now() - timedelta(days=7),
+            Order.created_at < datetime.now(),
+        ),
+    ),
+    Query(
+        "live_daily_sales",
+        "api_v1/analytics/crud.py",
+        lambda: live_daily_sales(TODAY - timedelta(days=7), TODAY),
+    ),
+)
+
+
+def seed_sample(session: Session) -> None:
+    # a few rows, so relationship loaders have something to load
+    john = User(username="john")
+    sam = User(username="sam")
+    mouse = Product(name="Mouse", description="Gaming mouse", price=100)
+    keyboard = Product(name="Keyboard", description="Gaming keyboard", price=149)
+    session.add_all(
+        [
+            Profile(user=john, first_name="john"),
+            Post(user=john, title="FastAPI Intro"),
+            Post(user=sam, title="SQLA 2.0"),
+        ]
+    )
+    for product in (mouse, keyboard):
+        order = Order(price=product.price)
+        order.products_details.append(
+            OrderProductAssociation(product=product, unit_price=product.price)
+        )
+        session.add(order)
+    session.commit()
+
+
+def capture_statements(engine: Engine, query: Query) -> list[tuple[str, Any]]:
+    captured: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not many:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with Session(engine) as session:
+            result = session.execute(query.build())
+            if not isinstance(result, CursorResult) or result.returns_rows:
+                result.unique().all()
+            session.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> list[str]:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}",
+            parameters,
+        )
+        return [row[-1] for row in rows]
+
+
+def scanned_table(detail: str) -> str | None:
+    # a virtual table "scan" is a lookup in its own index (FTS5 MATCH)
+    if "VIRTUAL TABLE INDEX" in detail:
+        return None
+    if match := SCAN.match(detail):
+        # joined eager loads alias tables as posts_1
+        return ALIAS_SUFFIX.sub("", match[1])
+    return None
+
+
+def advise(sample_engine: Engine, target_engine: Engine) -> int:
+    problems = 0
+    for query in QUERIES:
+        print(f"{query.name} ({query.source})")
+        for statement, parameters in capture_statements(sample_engine, query):
+            print(f"  {' '.join(statement.split())}")
+            for detail in explain(target_engine, statement, parameters):
+                table = scanned_table(detail)
+                flagged = "AUTOMATIC" in detail or (
+                    table is not None and table not in query.full_scan_ok
+                )
+                problems += flagged
+                print(f"    {'!!' if flagged else '  '} {detail}")
+    print(f"\n{problems} full scan(s) flagged")
+    return 1 if problems else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tools.index_advisor")
+    parser.add_argument(
+        "--url",
+        help="SQLite database to explain against, defaults to the models' schema",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    sample_engine = create_engine("sqlite://")
+    Base.metadata.create_all(sample_engine)
+    with Session(sample_engine) as session:
+        seed_sample(session)
+
+    target_engine = sample_engine
+    if args.url:
+        url = make_url(args.url)
+        if url.get_backend_name() != "sqlite":
+            sys.exit("EXPLAIN QUERY PLAN needs a SQLite database")
+        target_engine = create_engine(url.set(drivername="sqlite"))
+    return advise(sample_engine, target_engine)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Bulk-load scale-test data into the configured database.
+
+    python -m tools.seed --users 1000000 --products 100000 --orders 3000000
+
+Rows are generated with skewed, repeatable distributions (a few users
+write most of the posts, a few products show up in most orders) and
+written with batched Core executemany inserts, one transaction per table.
+Ids are assigned here, so order lines and order totals don't need any
+round trip back to the database. New rows are appended after the
+existing ones.
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Connection, Table, create_engine, event, func, insert, select
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from core.models import (
+    Base,
+    Order,
+    OrderProductAssociation,
+    Post,
+    Product,
+    Profile,
+    User,
+)
+
+FIRST_NAMES = ("Anna", "Boris", "Chen", "Daria", "Emil", "Fatima", "Igor", "Lena")
+LAST_NAMES = ("Ivanova", "Smith", "Kim", "Petrov", "Garcia", "Novak", "Sato")
+WORDS = (
+    "fast", "api", "async", "shop", "order", "price", "cache", "index",
+    "query", "worker", "stream", "token", "session", "replica", "batch",
+)  # fmt: skip
+
+
+def skewed(rng: random.Random, size: int, skew: float) -> int:
+    """Id in 1..size, low ids picked far more often the higher `skew` is."""
+    return int(size * rng.random() ** skew) + 1
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def next_id(connection: Connection, table: Table) -> int:
+    return (connection.scalar(select(func.max(table.c.id))) or 0) + 1
+
+
+def generate_users(rng: random.Random, first_id: int, count: int) -> Iterator[dict]:
+    for user_id in range(first_id, first_id + count):
+        yield {"id": user_id, "username": f"user{user_id}"}
+
+
+def generate_profiles(
+    rng: random.Random,
+    first_user_id: int,
+    users: int,
+) -> Iterator[dict]:
+    for user_id in range(first_user_id, first_user_id + users):
+        # not everyone fills in a profile
+        if rng.random() < 0.7:
+            yield {
+                "user_id": user_id,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "bio": (
+                    sentence(rng, rng.randint(3, 12)) if rng.random() < 0.4 else None
+                ),
+            }
+
+
+def generate_posts(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    first_user_id: int,
+    users: int,
+) -> Iterator[dict]:
+    for post_id in range(first_id, first_id + count):
+        yield {
+            "id": post_id,
+            "user_id": first_user_id - 1 + skewed(rng, users, 3.0),
+            "title": sentence(rng, rng.randint(2, 8)).capitalize(),
+            "body": sentence(rng, rng.randint(10, 60)),
+        }
+
+
+def generate_products(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    prices: dict[int, int],
+) -> Iterator[dict]:
+    for product_id in range(first_id, first_id + count):
+        # most products are cheap, a long tail is expensive
+        price = max(1, int(rng.lognormvariate(7, 1)))
+        prices[product_id] = price
+        yield {
+            "id": product_id,
+            "name": f"{sentence(rng, 2).title()} {product_id}",
+            "description": sentence(rng, rng.randint(5, 20)),
+            "price": price,
+        }
+
+
+def generate_orders(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    prices: dict[int, int],
+    lines_per_order: float,
+    days: int,
+    lines: list[dict],
+) -> Iterator[dict]:
+    """Yields orders and fills `lines` with their order lines as a side effect."""
+    product_ids = list(prices)
+    now = datetime.now()
+    for order_id in range(first_id, first_id + count):
+        line_count = min(
+            1 + int(rng.expovariate(1 / (lines_per_order - 1))),
+            len(product_ids),
+        )
+        chosen = {
+            product_ids[skewed(rng, len(product_ids), 2.0) - 1]
+            for _ in range(line_count)
+        }
+        total = 0
+        for product_id in chosen:
+            quantity = 1 if rng.random() < 0.8 else rng.randint(2, 5)
+            unit_price = prices[product_id]
+            total += quantity * unit_price
+            lines.append(
+                {
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "count": quantity,
+                    "unit_price": unit_price,
+                }
+            )
+        yield {
+            "id": order_id,
+            "promocode": f"PROMO{rng.randint(1, 20)}" if rng.random() < 0.1 else None,
+            "created_at": now - timedelta(seconds=rng.randint(0, days * 24 * 60 * 60)),
+            "price": total,
+        }
+
+
+def batches(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(
+    connection: Connection,
+    table: Table,
+    rows: Iterator[dict],
+    batch_size: int,
+    on_batch: Callable[[], None] | None = None,
+) -> int:
+    started_at = time.perf_counter()
+    total = 0
+    for batch in batches(rows, batch_size):
+        connection.execute(insert(table), batch)
+        total += len(batch)
+        if on_batch is not None:
+            on_batch()
+    elapsed = time.perf_counter() - started_at
+    print(f"{table.name}: {total} rows in {elapsed:.1f}s")
+    return total
+
+
+def make_engine(url: str):
+    # the seeder is a plain sync script, use the dialect's default sync driver
+    engine_url = make_url(url)
+    engine = create_engine(engine_url.set(drivername=engine_url.get_backend_name()))
+    if engine.dialect.name == "sqlite":
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            # a seeded database can always be rebuilt, durability isn't needed
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA cache_size=-256000")
+            cursor.close()
+
+    return engine
+
+
+def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    engine = make_engine(args.url)
+    try:
+        Base.metadata.create_all(engine)
+        tables: dict[str, Any] = {
+            model.__name__: model.__table__
+            for model in (User, Profile, Post, Product, Order, OrderProductAssociation)
+        }
+
+        with engine.begin() as connection:
+            first_user_id = next_id(connection, tables["User"])
+            load(
+                connection,
+                tables["User"],
+                generate_users(rng, first_user_id, args.users),
+                args.batch_size,
+            )
+            load(
+                connection,
+                tables["Profile"],
+                generate_profiles(rng, first_user_id, args.users),
+                args.batch_size,
+            )
+
+        with engine.begin() as connection:
+            if args.posts and args.users:
+                load(
+                    connection,
+                    tables["Post"],
+                    generate_posts(
+                        rng,
+                        next_id(connection, tables["Post"]),
+                        args.posts,
+                        first_user_id,
+                        args.users,
+                    ),
+                    args.batch_size,
+                )
+
+        prices: dict[int, int] = {}
+        with engine.begin() as connection:
+            load(
+                connection,
+                tables["Product"],
+                generate_products(
+                    rng,
+                    next_id(connection, tables["Product"]),
+                    args.products,
+                    prices,
+                ),
+                args.batch_size,
+            )
+
+        if not (args.orders and prices):
+            return
+        with engine.begin() as connection:
+            lines: list[dict] = []
+            line_table = tables["OrderProductAssociation"]
+
+            def flush_lines() -> None:
+                # the lines of every order batch go in right after it
+                connection.execute(insert(line_table), lines)
+                lines.clear()
+
+            load(
+                connection,
+                tables["Order"],
+                generate_orders(
+                    rng,
+                    next_id(connection, tables["Order"]),
+                    args.orders,
+                    prices,
+                    args.lines_per_order,
+                    args.days,
+                    lines,
+                ),
+                args.batch_size,
+                on_batch=flush_lines,
+            )
+            line_total = connection.scalar(select(func.count()).select_from(line_table))
+            print(f"{line_table.name}: {line_total} rows total")
+    finally:
+        engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tools.seed")
+    parser.add_argument("--url", default=settings.db.url)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--lines-per-order", type=float, default=3.3)
+    parser.add_argument("--days", type=int, default=365, help="order history span")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.lines_per_order <= 1:
+        parser.error("--lines-per-order must be greater than 1")
+    return args
+
+
+if __name__ == "__main__":
+    seed(parse_args())
@@ -0,0 +1,92 @@
+"""
+Local receiver for the outbox webhook sink.
+
+    python -m tools.webhook_stub --port 8081 --fail-rate 0.3 --output events.ndjson
+    OUTBOX='{"sinks":["webhook"],"webhook_url":"http://127.0.0.1:8081/"}' uvicorn main:app
+
+Answers a --fail-rate share of the batches with 503, so the relay's
+retries can be watched, and dedupes by event id the way a real consumer
+has to under at-least-once delivery. Every new event is appended to
+--output and a line per batch is printed.
+"""
+
+import argparse
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tools.webhook_stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="share of batches to reject"
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args()
+
+
+class Receiver:
+    def __init__(self, fail_rate: float, output: Path | None, rng: random.Random):
+        self.fail_rate = fail_rate
+        self.output = output
+        self.rng = rng
+        self.seen: set[int] = set()
+        self.duplicates = 0
+        self.lock = threading.Lock()
+
+    def receive(self, events: list[dict]) -> bool:
+        with self.lock:
+            if self.rng.random() < self.fail_rate:
+                return False
+            new = [event for event in events if event["id"] not in self.seen]
+            self.seen.update(event["id"] for event in new)
+            self.duplicates += len(events) - len(new)
+            if self.output and new:
+                with open(self.output, "a", encoding="utf-8") as file:
+                    file.writelines(json.dumps(event) + "\n" for event in new)
+            return True
+
+
+def make_handler(receiver: Receiver) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            events = json.loads(self.rfile.read(length))["events"]
+            accepted = receiver.receive(events)
+            self.send_response(200 if accepted else 503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            print(
+                f"{'accepted' if accepted else 'rejected'} "
+                f"batch {self.headers.get('Idempotency-Key')}: "
+                f"{len(events)} events, {len(receiver.seen)} unique, "
+                f"{receiver.duplicates} duplicates",
+                flush=True,
+            )
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    args = parse_args()
+    receiver = Receiver(args.fail_rate, args.output, random.Random(args.seed))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(receiver))
+    print(f"listening on http://{args.host}:{args.port}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()